@@ -4,7 +4,10 @@ from flask import Flask
 from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
 import os
-from flask import Flask, render_template
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context, abort
+from data import city_warmer, export_jobs, live_refresh, metrics
+from data.climate_export import FORMATS, iter_arrow, iter_csv
+from data.climate_repository import select
 
 load_dotenv()
 API_KEY = os.getenv("OPENWEATHER_API_KEY")
@@ -14,6 +17,18 @@ server = Flask(__name__)
 server.secret_key = "your_secret_key"
 server.wsgi_app = ProxyFix(server.wsgi_app)
 
+# ✅ The process that serves requests: under `python app.py` the reloader's child
+# (WERKZEUG_RUN_MAIN; its parent only watches files), under a WSGI server any
+# importer with START_BACKGROUND_JOBS=1. Tests and benchmarks import app without it.
+if __name__ == "__main__":
+    SERVING = os.getenv("WERKZEUG_RUN_MAIN") == "true"
+else:
+    SERVING = os.getenv("START_BACKGROUND_JOBS") == "1"
+
+# ✅ Map export workers are forked now, before the pages start any threads
+if SERVING:
+    export_jobs.start()
+
 # ✅ External stylesheets: Bootstrap + Font Awesome
 external_stylesheets = [
     "https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css",
@@ -34,9 +49,61 @@ app.layout = html.Div([
     dash.page_container
 ])
 
+# ✅ Background jobs (need an API key), only in the serving process: live state
+# values for the map pages and hot/default cities kept warm in the weather cache.
+# Each gunicorn worker runs its own, so share the API quota with
+# OPENWEATHER_RATE_STATE_FILE.
+if SERVING:
+    live_refresh.start()
+    city_warmer.start()
+
 @server.route("/privacy")
 def privacy_policy():
     return render_template("privacy_policy.html")
 
+# ✅ Streaming export of the Data Table selection
+# /export/climate.csv?year=2014&country=India&filter={CO2} > 5&sort=CO2:desc,Year:asc
+@server.route("/export/climate.<fmt>")
+def export_climate(fmt):
+    if fmt not in FORMATS:
+        abort(404)
+    year = request.args.get("year")
+    if year:
+        try:
+            year = int(year)
+        except ValueError:
+            return Response(f"year must be a whole number, got {year!r}", status=400, mimetype="text/plain")
+    else:
+        year = None
+    country = request.args.get("country") or None
+    filter_query = request.args.get("filter", "")
+    sort_by = []
+    for part in filter(None, request.args.get("sort", "").split(",")):
+        column, _, direction = part.partition(":")
+        sort_by.append({"column_id": column, "direction": "desc" if direction == "desc" else "asc"})
+
+    rows = select(year=year, country=country)
+    try:
+        if fmt == "csv":
+            body = iter_csv(rows, filter_query, sort_by)
+        else:
+            body = iter_arrow(rows, fmt, filter_query, sort_by)
+    except ValueError as e:
+        return Response(str(e), status=400, mimetype="text/plain")
+    except ImportError:
+        return Response("Parquet/Arrow export needs the pyarrow package.", status=501, mimetype="text/plain")
+
+    name = "_".join(str(v) for v in ("climate", country, year) if v)
+    return Response(
+        stream_with_context(body),
+        mimetype=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+# ✅ Cache / upstream counters for monitoring
+@server.route("/metrics")
+def metrics_endpoint():
+    return jsonify(metrics.snapshot())
+
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,82 @@
+// Clientside callbacks for pure-UI updates (clocks, tips, sidebar, map panning).
+// They run in the browser, so an idle open tab sends no requests to the server.
+// Registered from the pages with ClientsideFunction(namespace="climaview", ...).
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    climaview: {
+        // Dashboard navbar clock: 2024-05-01 13:45:09
+        dashboardClock: function(n) {
+            var d = new Date();
+            var pad = function(v) { return String(v).padStart(2, "0"); };
+            return d.getFullYear() + "-" + pad(d.getMonth() + 1) + "-" + pad(d.getDate()) + " " +
+                pad(d.getHours()) + ":" + pad(d.getMinutes()) + ":" + pad(d.getSeconds());
+        },
+
+        // Home page clock: Wednesday, 01 May 2024 | 01:45:09 PM
+        homeClock: function(n) {
+            var d = new Date();
+            var pad = function(v) { return String(v).padStart(2, "0"); };
+            var days = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"];
+            var months = ["January", "February", "March", "April", "May", "June", "July",
+                          "August", "September", "October", "November", "December"];
+            var hours = d.getHours() % 12 || 12;
+            return days[d.getDay()] + ", " + pad(d.getDate()) + " " + months[d.getMonth()] + " " +
+                d.getFullYear() + " | " + pad(hours) + ":" + pad(d.getMinutes()) + ":" +
+                pad(d.getSeconds()) + " " + (d.getHours() < 12 ? "AM" : "PM");
+        },
+
+        // Dashboard tips: a random tip from the list stored in the page, different from the current one
+        rotateTip: function(n, tips, current) {
+            if (!tips || !tips.length) {
+                return window.dash_clientside.no_update;
+            }
+            var choices = tips.length > 1 ? tips.filter(function(t) { return t !== current; }) : tips;
+            return choices[Math.floor(Math.random() * choices.length)];
+        },
+
+        toggleSidebar: function(n, className) {
+            var classes = (className || "sidebar-panel").split(" ").filter(Boolean);
+            var i = classes.indexOf("open");
+            if (i >= 0) {
+                classes.splice(i, 1);
+            } else {
+                classes.push("open");
+            }
+            return classes.join(" ");
+        },
+
+        // State maps: center on the selected state and highlight its marker.
+        // mapStates = {"trace": <marker trace index>, "states": {name: [index, lat, lon]}}
+        panToState: function(selected, mapStates, figure) {
+            var entry = mapStates && mapStates.states[selected];
+            if (!entry || !figure) {
+                return window.dash_clientside.no_update;
+            }
+            var layout = Object.assign({}, figure.layout);
+            layout.mapbox = Object.assign({}, layout.mapbox, {
+                center: {lat: entry[1], lon: entry[2]},
+                zoom: 6
+            });
+            var data = figure.data.slice();
+            data[mapStates.trace] = Object.assign({}, data[mapStates.trace], {selectedpoints: [entry[0]]});
+            return Object.assign({}, figure, {layout: layout, data: data});
+        },
+
+        // State maps: {zoom, bounds: [west, south, east, north]} after a pan/zoom,
+        // for maps whose mapStates.dense asks the server to thin the field.
+        mapView: function(relayout, mapStates) {
+            var zoom = relayout && relayout["mapbox.zoom"];
+            if (!mapStates || !mapStates.dense || zoom === undefined) {
+                return window.dash_clientside.no_update;
+            }
+            var derived = relayout["mapbox._derived"];
+            var bounds = null;
+            if (derived && derived.coordinates) {
+                var lons = derived.coordinates.map(function(c) { return c[0]; });
+                var lats = derived.coordinates.map(function(c) { return c[1]; });
+                bounds = [Math.min.apply(null, lons), Math.min.apply(null, lats),
+                          Math.max.apply(null, lons), Math.max.apply(null, lats)];
+            }
+            return {zoom: zoom, bounds: bounds};
+        }
+    }
+});
@@ -0,0 +1,70 @@
+"""
+Benchmark: (Country, Year) filtering in the climate callbacks, boolean mask vs prebuilt index.
+
+Builds synthetic climate.csv files 1x, 10x, 100x and 1000x the size of the
+bundled one and times the lookups the data table / global metrics callbacks
+do. Masked scans grow linearly with the row count; indexed lookups stay flat.
+
+    python -m benchmarks.climate_lookup
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_ROWS = 550  # rows in data/climate.csv
+SCALES = (1, 10, 100, 1000)
+REPEATS = 200
+
+
+def _write_dataset(path, rows):
+    # about 50 countries per year like the real file; more rows -> more countries and years
+    n_years = max(11, int(round(np.sqrt(rows / 50) * 3.3)))
+    n_countries = int(np.ceil(rows / n_years))
+    countries = np.array([f"Country {i:06d}" for i in range(n_countries)])
+    years = 2014 + np.arange(n_years)
+    grid_c, grid_y = np.meshgrid(countries, years)
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Country": grid_c.ravel()[:rows],
+        "Year": grid_y.ravel()[:rows],
+        "CO2": rng.uniform(0, 10, rows).round(2),
+        "Temperature": rng.uniform(-5, 30, rows).round(2),
+    })
+    df.to_csv(path, index=False)
+    return df
+
+
+def _time(fn):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - start) / REPEATS * 1e6  # microseconds
+
+
+def main():
+    from data import climate_repository as repo
+
+    print(f"{'rows':>10} {'mask (us)':>12} {'index (us)':>12} {'year mask':>12} {'year index':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in SCALES:
+            path = os.path.join(tmp, f"climate_{scale}.csv")
+            raw = _write_dataset(path, BASE_ROWS * scale)
+            repo.CLIMATE_CSV_PATH = path
+            repo._snapshot = None
+            df = repo.get_climate_df()
+            country = str(raw["Country"].iloc[len(raw) // 2])
+            year = int(raw["Year"].iloc[len(raw) // 2])
+
+            mask_pair = _time(lambda: df[(df["Year"] == year) & (df["Country"] == country)])
+            index_pair = _time(lambda: repo.select(year=year, country=country))
+            mask_year = _time(lambda: df[df["Year"] == year])
+            index_year = _time(lambda: repo.select(year=year))
+            assert len(repo.select(year=year, country=country)) == 1
+            print(f"{len(df):>10} {mask_pair:>12.1f} {index_pair:>12.1f} {mask_year:>12.1f} {index_year:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Benchmark: server requests generated by idle open tabs, measured on a live server.
+
+Serves the app on a local port and opens simulated tabs on every registered
+page. Each tab loads its page the way the Dash renderer does (the index,
+/_dash-layout, /_dash-dependencies, then the pages callback for the page
+content) and then sits idle: every enabled dcc.Interval in what it received
+ticks on its own period, and the tab POSTs each server-side callback that
+tick triggers, with the current input and state values from its layout.
+Clientside callbacks run in the browser and send nothing. The server counts
+the /_dash-update-component requests it receives from each page during an
+IDLE_SECONDS window that starts after every tab has loaded.
+
+Tabs are plain HTTP clients, not browsers, so only interval-driven traffic is
+reproduced; anything the user would click is out of scope.
+
+    python -m benchmarks.idle_tab_load
+"""
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from werkzeug.serving import make_server
+
+TAB_COUNTS = (1, 20)
+IDLE_SECONDS = 10.0
+PAGE_HEADER = "X-Idle-Tab-Page"
+
+_hits = Counter()
+_hit_outputs = defaultdict(Counter)
+_hits_lock = threading.Lock()
+
+
+def _serve():
+    """Starts the app on a daemon thread and returns (registered page paths, base URL)."""
+    import dash
+    import flask
+
+    import app
+
+    @app.server.before_request
+    def _count():
+        page = flask.request.headers.get(PAGE_HEADER)
+        if page and flask.request.path == "/_dash-update-component":
+            output = (flask.request.get_json(silent=True) or {}).get("output", "?")
+            with _hits_lock:
+                _hits[page] += 1
+                _hit_outputs[page][output] += 1
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, app.server, threaded=True)
+    threading.Thread(target=server.serve_forever, name="idle-tab-app", daemon=True).start()
+    paths = sorted(page["path"] for page in dash.page_registry.values())
+    return paths, f"http://127.0.0.1:{server.server_port}"
+
+
+def _components(node):
+    """Yields every component dict in a serialized layout."""
+    if isinstance(node, list):
+        for child in node:
+            yield from _components(child)
+    elif isinstance(node, dict):
+        if "type" in node and "props" in node:
+            yield node
+            node = node["props"]
+        for value in node.values():
+            yield from _components(value)
+
+
+def _outputs(output):
+    # "id.prop" or, for several outputs, "..id1.prop1...id2.prop2.."
+    return [dict(zip(("id", "property"), part.rsplit(".", 1))) for part in output.strip(".").split("...")]
+
+
+class _IdleTab:
+    """One open tab on one page, doing only what the renderer does while nobody touches it."""
+
+    def __init__(self, base, path):
+        self.base = base
+        self.path = path
+        self.session = requests.Session()
+        self.session.headers[PAGE_HEADER] = path
+        self.props = {}
+        self.callbacks = []
+        self.errors = 0
+
+    def load(self):
+        self.session.get(self.base + self.path).raise_for_status()
+        layout = self.session.get(self.base + "/_dash-layout").json()
+        dependencies = self.session.get(self.base + "/_dash-dependencies").json()
+        (pages,) = [d for d in dependencies if "_pages_content.children" in d["output"]]
+        content = self._post(pages, [
+            {"id": "_pages_location", "property": "pathname", "value": self.path},
+            {"id": "_pages_location", "property": "search", "value": ""},
+        ], [], "_pages_location.pathname").json()["response"]["_pages_content"]["children"]
+        self.props = {
+            c["props"]["id"]: c for c in _components([layout, content])
+            if isinstance(c["props"].get("id"), str)
+        }
+        # the renderer only runs a callback whose outputs are all on the page
+        self.callbacks = [
+            d for d in dependencies
+            if not d.get("clientside_function") and all(o["id"] in self.props for o in _outputs(d["output"]))
+        ]
+
+    def intervals(self):
+        return [
+            (id_, c["props"].get("interval", 1000) / 1000.0) for id_, c in self.props.items()
+            if c["type"] == "Interval" and not c["props"].get("disabled", False)
+        ]
+
+    def tick(self, interval_id):
+        props = self.props[interval_id]["props"]
+        props["n_intervals"] = props.get("n_intervals", 0) + 1
+        for d in self.callbacks:
+            if not any(i["id"] == interval_id and i["property"] == "n_intervals" for i in d["inputs"]):
+                continue
+            response = self._post(d, self._values(d["inputs"]), self._values(d["state"]), f"{interval_id}.n_intervals")
+            if response.status_code not in (200, 204):
+                self.errors += 1
+
+    def idle(self, stop):
+        due = {id_: time.monotonic() + period for id_, period in self.intervals()}
+        periods = dict(self.intervals())
+        while due and not stop.is_set():
+            id_ = min(due, key=due.get)
+            if stop.wait(max(0.0, due[id_] - time.monotonic())):
+                break
+            self.tick(id_)
+            due[id_] += periods[id_]
+
+    def _values(self, deps):
+        return [
+            dict(d, value=self.props.get(d["id"], {}).get("props", {}).get(d["property"]))
+            for d in deps
+        ]
+
+    def _post(self, dependency, inputs, state, changed):
+        outputs = _outputs(dependency["output"])
+        return self.session.post(self.base + "/_dash-update-component", json={
+            "output": dependency["output"],
+            "outputs": outputs if len(outputs) > 1 else outputs[0],
+            "inputs": inputs,
+            "state": state,
+            "changedPropIds": [changed],
+        })
+
+
+def measure(paths, base, tabs):
+    """{page path: (update requests per second over the window, {callback output: requests}, errors)}."""
+    open_tabs = [_IdleTab(base, path) for path in paths for _ in range(tabs)]
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(_IdleTab.load, open_tabs))
+
+    with _hits_lock:
+        _hits.clear()
+        _hit_outputs.clear()
+    stop = threading.Event()
+    threads = [threading.Thread(target=tab.idle, args=(stop,), daemon=True) for tab in open_tabs]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    time.sleep(IDLE_SECONDS)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    errors = Counter()
+    for tab in open_tabs:
+        errors[tab.path] += tab.errors
+    with _hits_lock:
+        return {path: (_hits[path] / elapsed, dict(_hit_outputs[path]), errors[path]) for path in paths}
+
+
+def main():
+    paths, base = _serve()
+    results = {tabs: measure(paths, base, tabs) for tabs in TAB_COUNTS}
+    print(f"/_dash-update-component requests/second from idle tabs ({IDLE_SECONDS:.0f} s window)")
+    print(f"{'page':<18}" + "".join(f"{n:>10} tabs" for n in TAB_COUNTS))
+    for path in paths:
+        print(f"{path:<18}" + "".join(f"{results[n][path][0]:>15.1f}" for n in TAB_COUNTS))
+        rate, outputs, errors = results[TAB_COUNTS[-1]][path]
+        for output, count in sorted(outputs.items()):
+            print(f"{'':<18}  <- {output} ({count} requests)")
+        if errors:
+            print(f"{'':<18}  !! {errors} failed requests")
+    totals = [sum(rate for rate, _, _ in results[n].values()) for n in TAB_COUNTS]
+    grows = totals[-1] > totals[0]
+    print(f"\nIdle-tab load grows with tab count: {'yes' if grows else 'no'} "
+          f"({' -> '.join(f'{t:.2f}' for t in totals)} req/s over all pages)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: live lookups against the replay stub, offline and reproducible.
+
+Writes synthetic OpenWeather /weather and /forecast fixtures for every state
+point into a temporary fixture store, then runs the data layer in
+UPSTREAM_MODE=replay with injected latency and errors: concurrent users
+looking up random cities, once with cold caches and once warm. Point
+UPSTREAM_FIXTURE_DIR at recorded fixtures (UPSTREAM_MODE=record) to replay
+real responses instead.
+
+    python -m benchmarks.upstream_replay
+"""
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+USERS = 16
+LOOKUPS = 400
+LATENCY_MS, JITTER_MS, ERROR_RATE = 80, 40, 0.02
+
+_fixture_dir = os.environ.get("UPSTREAM_FIXTURE_DIR") or tempfile.mkdtemp(prefix="replay-")
+os.environ.update({
+    "UPSTREAM_MODE": "replay",
+    "UPSTREAM_FIXTURE_DIR": _fixture_dir,
+    "REPLAY_LATENCY_MS": str(LATENCY_MS),
+    "REPLAY_JITTER_MS": str(JITTER_MS),
+    "REPLAY_ERROR_RATE": str(ERROR_RATE),
+    "REPLAY_SEED": "0",
+    "OPENWEATHER_API_KEY": os.environ.get("OPENWEATHER_API_KEY") or "replay",
+})
+# measure the upstream path, not the quota
+os.environ.setdefault("OPENWEATHER_CALLS_PER_MINUTE", "1000000")
+os.environ.setdefault("OPENWEATHER_BURST", "1000000")
+
+import json  # noqa: E402
+from types import SimpleNamespace  # noqa: E402
+
+from data import fetch_data, replay  # noqa: E402
+from data.geo_registry import state_table  # noqa: E402
+
+WEATHER_URL = "http://api.openweathermap.org/data/2.5/weather"
+FORECAST_URL = "http://api.openweathermap.org/data/2.5/forecast"
+
+
+def _response(payload):
+    return SimpleNamespace(
+        status_code=200, headers={"Content-Type": "application/json"}, text=json.dumps(payload),
+        elapsed=SimpleNamespace(total_seconds=lambda: 0.0),
+    )
+
+
+def _write_fixtures(cities):
+    rng = random.Random(0)
+    now = int(time.time()) // 10800 * 10800
+    for city in cities:
+        weather = {
+            "cod": 200, "name": city, "coord": {"lat": 20.0, "lon": 78.0},
+            "main": {"temp": rng.uniform(10, 35), "humidity": rng.randint(30, 90)},
+            "weather": [{"description": "clear sky"}], "wind": {"speed": rng.uniform(0, 8), "deg": rng.randint(0, 359)},
+        }
+        replay.record(WEATHER_URL, {"q": city, "units": "metric"}, _response(weather))
+        slots = [
+            {"dt": now + 10800 * (i + 1), "main": {"temp": rng.uniform(10, 35), "humidity": 60},
+             "wind": {"speed": rng.uniform(0, 8)}, "weather": [{"description": "clouds"}]}
+            for i in range(40)
+        ]
+        forecast = {"cod": "200", "list": slots, "city": {"name": city, "timezone": 19800}}
+        replay.record(FORECAST_URL, {"q": city, "units": "metric"}, _response(forecast))
+
+
+def _run(cities, fn):
+    rng = random.Random(1)
+    picks = [rng.choice(cities) for _ in range(LOOKUPS)]
+
+    def one(city):
+        started = time.perf_counter()
+        result = fn(city)
+        return (time.perf_counter() - started) * 1000, "error" in result
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=USERS) as pool:
+        results = list(pool.map(one, picks))
+    wall = time.perf_counter() - started
+    ms = sorted(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    return wall, ms[len(ms) // 2], ms[int(len(ms) * 0.95)], errors
+
+
+def main():
+    cities = state_table()["state"].tolist()
+    _write_fixtures(cities)
+    print(f"fixtures: {_fixture_dir}  latency {LATENCY_MS}±{JITTER_MS} ms, error rate {ERROR_RATE:.0%}, "
+          f"{USERS} users, {LOOKUPS} lookups over {len(cities)} cities")
+    print(f"{'lookup':>10} {'cache':>6} {'wall s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for name, fn, cache in (
+        ("weather", fetch_data.get_real_time_weather_data, fetch_data._weather_cache),
+        ("forecast", fetch_data.get_5_day_forecast_data, fetch_data._forecast_cache),
+    ):
+        cache.clear()
+        for label in ("cold", "warm"):
+            wall, p50, p95, errors = _run(cities, fn)
+            print(f"{name:>10} {label:>6} {wall:>8.2f} {p50:>8.1f} {p95:>8.1f} {errors:>7}")
+    print({k: v for k, v in replay.stats().items() if isinstance(v, int)})
+
+
+if __name__ == "__main__":
+    main()
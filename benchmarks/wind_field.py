@@ -0,0 +1,82 @@
+"""
+Benchmark: wind arrows for gridded fields, old per-row loop vs data/wind_field.py.
+
+Builds regular lat/lon grids over India with 1k to 100k vectors and times
+the arrow geometry (the per-row iterrows loop pages/wind.py used, vs the
+vectorized arrow_paths) and the zoom thinning used on the wind map, over
+all of India and clipped to a 1280x720 px view centred on the country.
+
+    python -m benchmarks.wind_field
+"""
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from data.wind_field import arrow_paths, thin_indices
+
+SIZES = (1_000, 10_000, 100_000)
+ZOOMS = (4, 6, 8)
+VIEW_PX = (1280, 720)
+VIEW_CENTER = (22.0, 82.0)
+
+
+def _grid(n):
+    side = int(np.ceil(np.sqrt(n)))
+    lat, lon = np.meshgrid(np.linspace(6, 36, side), np.linspace(68, 97, side))
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "lat": lat.ravel()[:n],
+        "lon": lon.ravel()[:n],
+        "wind": rng.uniform(0, 15, n),
+        "wind_dir": rng.uniform(0, 360, n),
+    })
+
+
+def _loop_paths(df, scale_km_per_ms=4.0):
+    lats, lons = [], []
+    for _, r in df.iterrows():
+        theta = math.radians(r["wind_dir"])
+        dist_km = r["wind"] * scale_km_per_ms
+        end_lat = r["lat"] + (dist_km * math.cos(theta)) / 111.0
+        end_lon = r["lon"] + (dist_km * math.sin(theta)) / (111.0 * math.cos(math.radians(r["lat"]) + 1e-8))
+        lats += [r["lat"], end_lat, None]
+        lons += [r["lon"], end_lon, None]
+    return lats, lons
+
+
+def _view_bounds(zoom):
+    """(west, south, east, north) of a VIEW_PX map at zoom, as mapbox._derived would report it."""
+    deg_per_px = 360.0 / (256.0 * 2.0 ** zoom)
+    lat, lon = VIEW_CENTER
+    half_w = VIEW_PX[0] / 2 * deg_per_px
+    half_h = VIEW_PX[1] / 2 * deg_per_px * math.cos(math.radians(lat))
+    return lon - half_w, lat - half_h, lon + half_w, lat + half_h
+
+
+def _time(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    print(f"{'vectors':>8} {'loop ms':>10} {'numpy ms':>10}  "
+          + "  ".join(f"thin z{z} ms (kept, in view)" for z in ZOOMS))
+    for n in SIZES:
+        df = _grid(n)
+        loop_ms = _time(_loop_paths, df) if n <= 10_000 else float("nan")  # the loop alone takes seconds at 100k
+        numpy_ms = _time(arrow_paths, df["lat"], df["lon"], df["wind"], df["wind_dir"])
+        thin = []
+        for z in ZOOMS:
+            start = time.perf_counter()
+            kept = thin_indices(df["lat"], df["lon"], z, df["wind"])
+            elapsed = (time.perf_counter() - start) * 1000
+            in_view = thin_indices(df["lat"], df["lon"], z, df["wind"], bounds=_view_bounds(z))
+            thin.append(f"{elapsed:>9.1f} ({len(kept):>6}, {len(in_view):>6})")
+        print(f"{n:>8} {loop_ms:>10.1f} {numpy_ms:>10.1f}  " + "  ".join(thin))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# --- In-process TTL + LRU cache ---
+# Shared by the live weather lookups in fetch_data.py so a reading fetched on
+# one page is reused by every other page until it expires. With stale_ttl,
+# expired entries are kept that much longer so get_stale can serve them while
+# a fresh value is fetched in the background (stale-while-revalidate).
+class TTLCache:
+    """Thread-safe mapping with per-entry expiry and LRU eviction."""
+
+    def __init__(self, ttl=300, max_entries=512, stale_ttl=0):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns the cached value, or None if it is missing or expired."""
+        value, stale = self.get_stale(key, allow_stale=False)
+        return value
+
+    def get_stale(self, key, allow_stale=True):
+        """
+        (value, is_stale). Expired values are returned (is_stale True) for up
+        to stale_ttl seconds past their expiry; (None, False) when missing.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            expires_at, value = entry
+            now = time.monotonic()
+            if expires_at <= now:
+                if now >= expires_at + self.stale_ttl:
+                    del self._data[key]
+                    self.misses += 1
+                    return None, False
+                if not allow_stale:
+                    self.misses += 1
+                    return None, False
+                self._data.move_to_end(key)
+                self.stale_hits += 1
+                return value, True
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value, False
+
+    def expires_in(self, key):
+        """Seconds until key expires (negative once stale), or None if it is not cached. Not counted in stats."""
+        with self._lock:
+            entry = self._data.get(key)
+            return None if entry is None else entry[0] - time.monotonic()
+
+    def set(self, key, value, ttl=None):
+        """Stores value for ttl seconds (the cache's default when None)."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "stale_ttl_seconds": self.stale_ttl,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                # stale hits are answered from the cache too
+                "hit_ratio": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+
+# --- LRU cache bounded by total size in bytes ---
+# Used for prebuilt figure JSON, where entries vary a lot in size.
+class ByteBudgetLRU:
+    """Thread-safe LRU mapping whose entries are evicted once their summed size exceeds max_bytes."""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # key -> (size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def set(self, key, value, size):
+        if size > self.max_bytes:
+            return  # would evict everything else and still not fit
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[0]
+            self._data[key] = (size, value)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (evicted_size, _) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,232 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from data import metrics
+
+# --- Circuit breakers and time budgets for upstream providers ---
+# Each provider (OpenWeather, NOAA, GNews) has a breaker that upstream.get
+# consults before every call. After CIRCUIT_FAILURE_THRESHOLD consecutive
+# failures (errors, 429/5xx responses, or calls slower than
+# CIRCUIT_SLOW_CALL_SECONDS) it opens and calls fail at once with
+# CircuitOpenError. After CIRCUIT_RESET_SECONDS one probe call is let through
+# (half-open); its outcome closes or re-opens the circuit.
+#
+# Budget pools run lookups on bounded worker pools and callers stop waiting
+# after the callback's time budget, so a slow provider never holds a request
+# thread longer than that. The lookup keeps running and fills the caches for
+# the next request. OpenWeather lookups and NOAA loads have separate pools, so
+# slow NOAA downloads cannot crowd out weather lookups.
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "8"))
+CALLBACK_BUDGET_SECONDS = float(os.getenv("CALLBACK_BUDGET_SECONDS", "6"))
+BUDGET_WORKERS = int(os.getenv("BUDGET_WORKERS", "16"))
+NOAA_BUDGET_WORKERS = int(os.getenv("NOAA_BUDGET_WORKERS", "4"))
+# Lookups waiting for a worker beyond this are not queued; the caller falls back at once
+BUDGET_MAX_PENDING = int(os.getenv("BUDGET_MAX_PENDING", "64"))
+
+PROVIDER_HOSTS = {
+    "api.openweathermap.org": "openweather",
+    "api.tidesandcurrents.noaa.gov": "noaa",
+    "gnews.io": "gnews",
+}
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+    def __init__(self, provider, retry_in):
+        super().__init__(f"{provider} is temporarily unavailable (retrying in {retry_in:.0f}s)")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Thread-safe closed / open / half-open breaker counting consecutive failures."""
+
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+                 reset_seconds=CIRCUIT_RESET_SECONDS, slow_call_seconds=CIRCUIT_SLOW_CALL_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "failures": 0, "slow_calls": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            return HALF_OPEN
+        return self._state
+
+    def retry_in(self):
+        """Seconds until an open circuit lets a probe through (0 unless open)."""
+        with self._lock:
+            if self._current_state() != OPEN:
+                return 0.0
+            return max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+
+    def before_call(self):
+        """Raises CircuitOpenError unless a call may go ahead."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                self._stats["calls"] += 1
+                return
+            if state == HALF_OPEN and not self._probing:
+                # exactly one probe; everyone else keeps failing fast until it reports
+                self._state = HALF_OPEN
+                self._probing = True
+                self._stats["calls"] += 1
+                return
+            self._stats["rejected"] += 1
+            retry_in = max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(self.name, retry_in)
+
+    def record(self, ok, elapsed=None):
+        """Reports a call's outcome; slow successes count as failures."""
+        slow = elapsed is not None and self.slow_call_seconds and elapsed > self.slow_call_seconds
+        with self._lock:
+            self._probing = False
+            if slow:
+                self._stats["slow_calls"] += 1
+            if ok and not slow:
+                self._state = CLOSED
+                self._failures = 0
+                return
+            self._stats["failures"] += 1
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._stats["opened"] += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            state = self._current_state()
+            return dict(
+                self._stats,
+                state=state,
+                consecutive_failures=self._failures,
+                retry_in_s=round(max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at)), 1)
+                if state == OPEN else 0.0,
+            )
+
+
+_breakers = {name: CircuitBreaker(name) for name in PROVIDER_HOSTS.values()}
+
+
+def breaker(provider):
+    return _breakers[provider]
+
+
+def breaker_for_url(url):
+    """The breaker of the provider serving url, or None for other hosts."""
+    name = PROVIDER_HOSTS.get(urlsplit(url).hostname or "")
+    return _breakers.get(name) if name else None
+
+
+# --- Time budgets for callbacks ---
+class _OverBudget:
+    pass
+
+
+OVER_BUDGET = _OverBudget()
+
+
+class PoolBusy(RuntimeError):
+    """Raised by BudgetPool.submit when max_pending jobs are already waiting or running."""
+
+
+class BudgetPool:
+    """Bounded worker pool for lookups that callers wait on for at most their time budget."""
+
+    def __init__(self, name, workers, max_pending=BUDGET_MAX_PENDING):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"budget-{name}")
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "waits": 0, "over_budget": 0, "rejected_busy": 0}
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedules fn and returns its Future; raises PoolBusy when the pool is saturated."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["rejected_busy"] += 1
+                raise PoolBusy(f"{self.name} pool is busy")
+            self._pending += 1
+            self._stats["submitted"] += 1
+
+        def run():
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._pending -= 1
+
+        return self._executor.submit(run)
+
+    def wait(self, done, budget=None):
+        """Waits on a threading.Event for at most budget seconds (CALLBACK_BUDGET_SECONDS when None)."""
+        finished = done.wait(CALLBACK_BUDGET_SECONDS if budget is None else budget)
+        with self._lock:
+            self._stats["waits"] += 1
+            if not finished:
+                self._stats["over_budget"] += 1
+        return finished
+
+    def call(self, budget, fn, *args, **kwargs):
+        """
+        fn(*args, **kwargs), or OVER_BUDGET if it has not finished within
+        budget seconds or the pool is saturated. Exceptions from fn are re-raised.
+        """
+        try:
+            future = self.submit(fn, *args, **kwargs)
+        except PoolBusy:
+            return OVER_BUDGET
+        done = threading.Event()
+        future.add_done_callback(lambda _: done.set())
+        if not self.wait(done, budget):
+            return OVER_BUDGET
+        return future.result()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, pending=self._pending, workers=self.workers, max_pending=self.max_pending)
+
+
+# Leader calls of coalesced OpenWeather lookups (one job per in-flight city, not per caller)
+upstream_pool = BudgetPool("openweather", BUDGET_WORKERS)
+# Sea level page loads (NOAA downloads and aggregation)
+noaa_pool = BudgetPool("noaa", NOAA_BUDGET_WORKERS)
+
+
+def stats():
+    return {
+        "providers": {name: b.stats() for name, b in _breakers.items()},
+        "callback_budget": {
+            "budget_s": CALLBACK_BUDGET_SECONDS,
+            "pools": {pool.name: pool.stats() for pool in (upstream_pool, noaa_pool)},
+        },
+    }
+
+
+metrics.register("circuit_breakers", stats)
@@ -0,0 +1,72 @@
+import logging
+import os
+import threading
+import time
+
+from data import fetch_data, metrics
+
+# --- Keeps the hottest cities' weather and forecasts warm ---
+# Every WARM_INTERVAL_SECONDS a daemon thread re-fetches, at background
+# priority, the cache entries of the pinned cities (the dashboard's
+# DEFAULT_CITY and WARM_PINNED_CITIES) and of the most requested cities that
+# expire within WARM_LEAD_SECONDS, so users rarely see a cold or stale entry.
+DEFAULT_CITY = os.getenv("DEFAULT_CITY", "Delhi")
+PINNED_CITIES = [DEFAULT_CITY] + [c.strip() for c in os.getenv("WARM_PINNED_CITIES", "").split(",") if c.strip()]
+WARM_INTERVAL_SECONDS = int(os.getenv("WARM_INTERVAL_SECONDS", "30"))
+WARM_LEAD_SECONDS = int(os.getenv("WARM_LEAD_SECONDS", "60"))
+WARM_TOP_CITIES = int(os.getenv("WARM_TOP_CITIES", "10"))
+
+logger = logging.getLogger(__name__)
+
+_thread = None
+_start_lock = threading.Lock()
+_stats = {"runs": 0, "refreshed": 0, "last_run_at": None}
+
+
+def _targets(kind):
+    pinned = [fetch_data._normalize_city(c) for c in PINNED_CITIES] if kind == "weather" else []
+    hot = fetch_data.hot_cities(kind, WARM_TOP_CITIES)
+    return list(dict.fromkeys(pinned + hot))
+
+
+def warm_once():
+    """Starts refreshes for every target entry that is missing or about to expire. Returns how many."""
+    refreshed = 0
+    for kind in ("weather", "forecast"):
+        for city in _targets(kind):
+            refreshed += fetch_data.refresh(kind, city, lead_seconds=WARM_LEAD_SECONDS)
+    _stats.update(runs=_stats["runs"] + 1, refreshed=_stats["refreshed"] + refreshed, last_run_at=time.time())
+    return refreshed
+
+
+def _loop():
+    while True:
+        try:
+            warm_once()
+        except Exception as e:
+            logger.warning("City warm-up failed: %s", e)
+        time.sleep(WARM_INTERVAL_SECONDS)
+
+
+def start():
+    """Starts the warmer thread once per process; a no-op without an API key or when disabled."""
+    global _thread
+    if not fetch_data.API_KEY or WARM_INTERVAL_SECONDS <= 0:
+        return False
+    with _start_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_loop, name="city-warmer", daemon=True)
+            _thread.start()
+    return True
+
+
+def stats():
+    return dict(
+        _stats,
+        running=_thread is not None,
+        pinned=PINNED_CITIES,
+        targets={kind: _targets(kind) for kind in ("weather", "forecast")},
+    )
+
+
+metrics.register("city_warmer", stats)
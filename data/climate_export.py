@@ -0,0 +1,94 @@
+import importlib.util
+import os
+
+from data.table_query import iter_filtered_chunks
+
+# --- Streaming export of the climate dataset ---
+# Generators that serialize the current Country/Year/filter selection chunk
+# by chunk, so a response starts sending bytes immediately and server memory
+# stays constant no matter how many rows match. Served by /export/climate.<fmt>
+# in app.py.
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "50000"))
+
+FORMATS = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+# Parquet and Arrow need the optional pyarrow package
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def _for_output(chunk):
+    # float32 storage -> float64 so values serialize as written in the source file
+    return chunk.astype({"CO2": "float64", "Temperature": "float64"}).round(4)
+
+
+def iter_csv(df, filter_query=None, sort_by=None, chunk_rows=None):
+    chunks = iter_filtered_chunks(df, filter_query, sort_by, chunk_rows or EXPORT_CHUNK_ROWS)
+
+    def generate():
+        yield ",".join(df.columns) + "\n"
+        for chunk in chunks:
+            yield _for_output(chunk).to_csv(header=False, index=False)
+
+    return generate()
+
+
+class _ChunkSink:
+    """Write-only file object that hands out whatever has been written since the last drain."""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def iter_arrow(df, fmt, filter_query=None, sort_by=None, chunk_rows=None):
+    """
+    Parquet (one row group per chunk) or Arrow IPC stream. Needs the optional pyarrow
+    package; raises ImportError if it isn't installed.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    chunks = iter_filtered_chunks(df, filter_query, sort_by, chunk_rows or EXPORT_CHUNK_ROWS)
+    schema = pa.Schema.from_pandas(_for_output(df.iloc[0:0]), preserve_index=False)
+
+    def generate():
+        sink = _ChunkSink()
+        if fmt == "parquet":
+            writer = pq.ParquetWriter(sink, schema)
+        else:
+            writer = pa.ipc.new_stream(sink, schema)
+        with writer:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(_for_output(chunk), schema=schema, preserve_index=False)
+                writer.write_table(table)
+                yield sink.drain()
+        # footer / end-of-stream marker
+        yield sink.drain()
+
+    return generate()
@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import threading
+
+import plotly.express as px
+import plotly.io as pio
+
+from data import metrics
+from data.cache import ByteBudgetLRU
+from data.climate_repository import dataset_version, select, year_bounds
+
+# --- Prebuilt choropleth figures for the Global Metrics page ---
+# px.choropleth geocodes every country name and validates the whole figure on
+# each build, so per-year maps are built once per (kind, year, dataset version)
+# and kept as plain figure dicts in a byte-budgeted LRU. prewarm() builds every
+# year in the background at startup (and again after a dataset reload), so
+# flipping through years only serves prebuilt JSON.
+FIGURE_CACHE_MAX_BYTES = int(os.getenv("FIGURE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+_figures = ByteBudgetLRU(max_bytes=FIGURE_CACHE_MAX_BYTES)
+_warmed_version = None  # dataset version the last prewarm ran for
+_warm_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def _co2_map(year):
+    filtered = select(year=year, ranked=True)
+    fig = px.choropleth(
+        filtered,
+        locations="Country",
+        locationmode="country names",
+        color="CO2",
+        hover_name="Country",
+        hover_data={"Temperature": ":.2f", "CO2": ":.2f"},
+        color_continuous_scale="Turbo",
+        title=f"🌏 Global CO₂ Emissions - {year}"
+    )
+    fig.update_geos(
+        visible=False, showcountries=True, countrycolor="gray", showocean=True, oceancolor="#b0e0e6",
+        showland=True, landcolor="#f0e68c", showlakes=True, lakecolor="#add8e6", projection_type="natural earth"
+    )
+    fig.update_layout(margin=dict(l=0, r=0, t=50, b=0), height=720)
+    return fig
+
+
+def _temperature_map(year):
+    fig = px.choropleth(
+        select(year=year),
+        locations="Country",
+        locationmode="country names",
+        color="Temperature",
+        hover_name="Country",
+        color_continuous_scale="YlOrRd",
+        title=f"Global Temperature in {year}"
+    )
+    return fig
+
+
+BUILDERS = {
+    "co2_map": _co2_map,
+    "temperature_map": _temperature_map,
+}
+
+
+def choropleth(kind, year):
+    """
+    Figure dict for one map kind and year, built at most once per dataset version.
+    Callers must treat the result as read-only: it is shared between callbacks.
+    """
+    version = dataset_version()
+    if version != _warmed_version:
+        start_prewarm()
+    key = (kind, int(year), version)
+    fig = _figures.get(key)
+    if fig is None:
+        fig = _build(kind, int(year), version)
+    return fig
+
+
+def _build(kind, year, version):
+    text = pio.to_json(BUILDERS[kind](year), validate=False)
+    fig = json.loads(text)
+    _figures.set((kind, year, version), fig, len(text))
+    return fig
+
+
+def prewarm():
+    """Builds every map kind for every year of the current dataset version."""
+    global _warmed_version
+    version = dataset_version()
+    _warmed_version = version  # set up front so a failing build isn't retried on every lookup
+    min_year, max_year = year_bounds()
+    for year in range(min_year, max_year + 1):
+        for kind in BUILDERS:
+            if (kind, year, version) not in _figures:
+                _build(kind, year, version)
+    logger.info("Prebuilt %s choropleths for dataset v%s", len(_figures), version)
+
+
+def start_prewarm():
+    """Runs prewarm() on a daemon thread unless one is already running."""
+    if not _warm_lock.acquire(blocking=False):
+        return
+    version = dataset_version()
+
+    def run():
+        try:
+            if version != _warmed_version:
+                prewarm()
+        except Exception as e:
+            logger.warning("Figure prewarm failed: %s", e)
+        finally:
+            _warm_lock.release()
+
+    threading.Thread(target=run, name="choropleth-prewarm", daemon=True).start()
+
+
+metrics.register("figure_cache", _figures.stats)
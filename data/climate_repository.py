@@ -0,0 +1,188 @@
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# --- Shared climate dataset (data/climate.csv) ---
+# Loaded once per process with compact dtypes and shared by the dashboard,
+# data table and global metrics pages. When the file's mtime changes the new
+# file is parsed in full and then swapped in atomically, so pages always see
+# one consistent version and datasets can be replaced without a restart.
+#
+# Each snapshot carries prebuilt indexes (rows are sorted by Year, then
+# Country): a dict of Year -> row slice and a dict of Country -> row
+# positions, so callbacks select a year, a country or a (Country, Year) pair
+# in O(1)/O(log N) instead of scanning every row with a boolean mask.
+CLIMATE_CSV_PATH = os.getenv(
+    "CLIMATE_CSV_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "climate.csv")
+)
+# How often (seconds) the file's mtime is checked for a hot reload
+RELOAD_CHECK_SECONDS = float(os.getenv("CLIMATE_RELOAD_CHECK_SECONDS", "5"))
+
+DTYPES = {"Country": "category", "Year": "int16", "CO2": "float32", "Temperature": "float32"}
+
+logger = logging.getLogger(__name__)
+
+
+class _Snapshot:
+    def __init__(self, df, version, mtime):
+        self.df = df
+        self.version = version
+        self.mtime = mtime
+        # materialized views computed from this version (see materialize())
+        self.views = {}
+        self.views_lock = threading.RLock()
+        self.year_slices, self.country_rows = _build_indexes(df)
+        self.country_codes = np.asarray(df["Country"].cat.codes)
+
+
+_snapshot = None
+_last_check = 0.0
+_lock = threading.Lock()
+
+
+def _read(path):
+    df = pd.read_csv(path, dtype=DTYPES)
+    return df.sort_values(["Year", "Country"], kind="stable").reset_index(drop=True)
+
+
+def _build_indexes(df):
+    years = df["Year"].to_numpy()
+    uniq, starts = np.unique(years, return_index=True)
+    stops = np.append(starts[1:], len(years))
+    year_slices = {int(y): slice(int(a), int(b)) for y, a, b in zip(uniq, starts, stops)}
+
+    codes = np.asarray(df["Country"].cat.codes)
+    order = np.argsort(codes, kind="stable")  # stable keeps each country's rows in year order
+    sorted_codes = codes[order]
+    bounds = np.searchsorted(sorted_codes, np.arange(len(df["Country"].cat.categories) + 1))
+    country_rows = {
+        country: order[bounds[i]:bounds[i + 1]]
+        for i, country in enumerate(df["Country"].cat.categories)
+        if bounds[i + 1] > bounds[i]
+    }
+    return year_slices, country_rows
+
+
+def _current():
+    """Returns the live snapshot, loading it on first use and reloading if the file changed."""
+    global _snapshot, _last_check
+    snap = _snapshot
+    now = time.monotonic()
+    if snap is not None and now - _last_check < RELOAD_CHECK_SECONDS:
+        return snap
+
+    with _lock:
+        snap = _snapshot
+        if snap is not None and now - _last_check < RELOAD_CHECK_SECONDS:
+            return snap
+        _last_check = now
+        try:
+            mtime = os.stat(CLIMATE_CSV_PATH).st_mtime_ns
+        except FileNotFoundError:
+            if snap is None:
+                raise
+            return snap  # keep serving the last good copy while the file is being replaced
+        if snap is not None and snap.mtime == mtime:
+            return snap
+        try:
+            df = _read(CLIMATE_CSV_PATH)
+        except Exception as e:
+            if snap is None:
+                raise
+            logger.warning("Keeping climate dataset v%s; reload failed: %s", snap.version, e)
+            return snap
+        version = 1 if snap is None else snap.version + 1
+        # single reference assignment: readers see either the old or the new snapshot
+        _snapshot = _Snapshot(df, version, mtime)
+        if snap is not None:
+            logger.info("Reloaded climate dataset (v%s, %s rows)", version, len(df))
+        return _snapshot
+
+
+def get_climate_df():
+    """
+    Read-only view of the dataset (Country, Year, CO2, Temperature), sorted by Year then Country.
+    Shallow: shares memory with the cached copy, so callers must not modify values in place.
+    """
+    return _current().df.copy(deep=False)
+
+
+def get_ranked_df():
+    """The dataset with a per-year temperature Rank column, computed once per dataset version."""
+    return _ranked(_current()).copy(deep=False)
+
+
+def _ranked(snap):
+    return materialize("ranked", _rank_by_year, snap)
+
+
+def _rank_by_year(df):
+    ranked = df.copy()
+    ranked["Rank"] = ranked.groupby("Year")["Temperature"].rank(ascending=False)
+    return ranked
+
+
+def materialize(name, build, snap=None):
+    """
+    Returns build(df) for the current dataset version, computing it only once.
+    Results live on the dataset snapshot, so a reload invalidates all of them.
+    """
+    snap = snap or _current()
+    try:
+        return snap.views[name]
+    except KeyError:
+        pass
+    with snap.views_lock:
+        if name not in snap.views:
+            snap.views[name] = build(snap.df)
+        return snap.views[name]
+
+
+def select(year=None, country=None, ranked=False):
+    """
+    Rows for a year, a country, or one (Country, Year) pair, via the prebuilt indexes.
+    With ranked=True the rows come from get_ranked_df() (adds the Rank column).
+    """
+    snap = _current()
+    frame = _ranked(snap) if ranked else snap.df
+
+    if year is not None:
+        sl = snap.year_slices.get(int(year))
+        if sl is None:
+            return frame.iloc[0:0]
+        if country is None:
+            return frame.iloc[sl]
+        # countries are sorted within a year: binary search for the code
+        categories = frame["Country"].cat.categories
+        if country not in categories:
+            return frame.iloc[0:0]
+        code = categories.get_loc(country)
+        codes = snap.country_codes[sl]
+        lo = int(np.searchsorted(codes, code, side="left"))
+        hi = int(np.searchsorted(codes, code, side="right"))
+        return frame.iloc[sl.start + lo:sl.start + hi]
+
+    if country is not None:
+        rows = snap.country_rows.get(country)
+        if rows is None:
+            return frame.iloc[0:0]
+        return frame.take(rows)
+    return frame.copy(deep=False)
+
+
+def dataset_version():
+    """Increments every time a changed file is reloaded."""
+    return _current().version
+
+
+def year_bounds():
+    df = _current().df
+    return int(df["Year"].min()), int(df["Year"].max())
+
+
+def countries():
+    return sorted(_current().df["Country"].unique().tolist())
@@ -0,0 +1,30 @@
+from data.climate_repository import materialize
+
+# --- Materialized aggregate views over the climate dataset ---
+# Global trends that don't depend on the selected year or country are computed
+# once per dataset version (and recomputed after a hot reload) instead of in
+# every callback. Per-year temperature ranks live in climate_repository
+# (select(..., ranked=True)) so they stay aligned with its row indexes.
+ROLLING_WINDOW_YEARS = 10
+
+
+def _yearly_global_means(df):
+    # accumulate in float64: the dataset stores float32
+    values = df[["Year", "Temperature", "CO2"]].astype({"Year": "int64", "Temperature": "float64", "CO2": "float64"})
+    return values.groupby("Year")[["Temperature", "CO2"]].mean().reset_index()
+
+
+def yearly_global_means():
+    """Global mean Temperature and CO2 per Year."""
+    return materialize("yearly_global_means", _yearly_global_means)
+
+
+def _global_temperature_trend(df):
+    trend = _yearly_global_means(df)[["Year", "Temperature"]].copy()
+    trend["Rolling_Temp"] = trend["Temperature"].rolling(window=ROLLING_WINDOW_YEARS).mean()
+    return trend
+
+
+def global_temperature_trend():
+    """Year, global mean Temperature and its 10-year rolling mean (Rolling_Temp)."""
+    return materialize("global_temperature_trend", _global_temperature_trend)
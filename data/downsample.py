@@ -0,0 +1,88 @@
+import numpy as np
+
+# --- Server-side downsampling of long time series before plotting ---
+# A year of 6-minute NOAA levels is ~87k points per trace; browsers only need
+# a couple of points per horizontal pixel. Both methods return sorted indices
+# into the input so several traces can share one selection, and both always
+# keep the first, last, global max and global min samples.
+
+
+def _bucket_edges(n, n_buckets):
+    # Interior points split into n_buckets equal-count buckets (first/last are kept apart)
+    return np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+
+
+def minmax_indices(y, n_out):
+    """Keeps the min and max of each bucket: fully vectorized, preserves every peak."""
+    y = np.asarray(y, dtype="float64")
+    n = len(y)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    n_buckets = max(1, (n_out - 2) // 2)
+    edges = _bucket_edges(n, n_buckets)
+    starts = edges[:-1]
+    starts = starts[starts < n - 1]
+    # reduceat gives per-bucket min/max; argmin/argmax are recovered by matching values
+    mins = np.minimum.reduceat(y[:n - 1], starts)
+    maxs = np.maximum.reduceat(y[:n - 1], starts)
+    bucket_of = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n - 1)))
+    idx = np.arange(starts[0], n - 1)
+    vals = y[starts[0]:n - 1]
+    is_min = vals == mins[bucket_of]
+    is_max = vals == maxs[bucket_of]
+    # first occurrence of the min and the max within each bucket
+    first_min = idx[is_min][np.unique(bucket_of[is_min], return_index=True)[1]]
+    first_max = idx[is_max][np.unique(bucket_of[is_max], return_index=True)[1]]
+    return _with_extremes(np.concatenate([[0, n - 1], first_min, first_max]), y)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: per bucket keeps the point forming the largest
+    triangle with the previously kept point and the next bucket's centroid.
+    The per-bucket area search is vectorized; only the bucket walk is a loop.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    n_buckets = n_out - 2
+    edges = _bucket_edges(n, n_buckets)
+    # centroid of every bucket, computed in one pass
+    counts = np.diff(edges)
+    sums_x = np.add.reduceat(x[:n - 1], edges[:-1])
+    sums_y = np.add.reduceat(y[:n - 1], edges[:-1])
+    cx = np.append(sums_x / counts, x[-1])
+    cy = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for i in range(n_buckets):
+        lo, hi = edges[i], edges[i + 1]
+        bx = x[lo:hi]
+        by = y[lo:hi]
+        area = np.abs((x[a] - cx[i + 1]) * (by - y[a]) - (x[a] - bx) * (cy[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return _with_extremes(selected, y)
+
+
+def _with_extremes(indices, y):
+    extremes = [int(np.nanargmax(y)), int(np.nanargmin(y))] if len(y) else []
+    return np.unique(np.concatenate([indices, extremes]).astype(np.int64))
+
+
+def downsample_indices(x, y, n_out, method="lttb"):
+    if method == "minmax":
+        return minmax_indices(y, n_out)
+    return lttb_indices(x, y, n_out)
+
+
+def target_points(width_px, points_per_px=2, minimum=400, maximum=6000):
+    """Number of points worth sending for a graph of the given pixel width."""
+    if not width_px:
+        width_px = 1200
+    return int(min(maximum, max(minimum, width_px * points_per_px)))
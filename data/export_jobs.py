@@ -0,0 +1,177 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import plotly.io as pio
+
+from data import metrics
+from data.climate_figures import choropleth
+from data.climate_repository import dataset_version
+
+# --- Background image export (Download Map buttons) ---
+# Rendering a PNG starts the Kaleido renderer and takes seconds, so it runs in
+# a small pool of worker processes instead of a request thread. Callbacks
+# submit() a job, poll result() from a dcc.Interval and send the file once it
+# is on disk. Identical exports (same map, year, format, size and dataset
+# version) share one job and one file under data/cache/images, which is
+# trimmed to EXPORT_IMAGE_MAX_BYTES (least recently used first).
+IMAGE_DIR = os.getenv(
+    "EXPORT_IMAGE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "images"),
+)
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+# Jobs allowed to wait or run at once; further submissions are refused
+EXPORT_MAX_PENDING = int(os.getenv("EXPORT_MAX_PENDING", "16"))
+EXPORT_IMAGE_MAX_BYTES = int(os.getenv("EXPORT_IMAGE_MAX_BYTES", str(256 * 1024 * 1024)))
+# multiprocessing start method for the workers. By default they are forked by
+# start() while the app is still single-threaded (fork is cheap: spawn would
+# re-import app.py and every page); a pool first needed once other threads run
+# uses spawn, since a forked child can deadlock on a lock held at fork time.
+EXPORT_START_METHOD = os.getenv("EXPORT_START_METHOD") or None
+
+_pool = None
+_pool_lock = threading.Lock()
+_jobs = {}  # job id -> Future, while queued or running
+_lock = threading.Lock()
+_counts = {"submitted": 0, "deduplicated": 0, "disk_hits": 0, "completed": 0, "failed": 0}
+
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            method = EXPORT_START_METHOD
+            if method is None:
+                can_fork = "fork" in multiprocessing.get_all_start_methods() and threading.active_count() == 1
+                method = "fork" if can_fork else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=EXPORT_WORKERS, mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def start():
+    """
+    Creates the pool and its worker processes now. Call it at startup before
+    anything starts a thread; with fork, every worker is forked on the first submit.
+    """
+    _executor().submit(os.getpid).result()
+
+
+def _render(fig, path, fmt, width, height):
+    """Runs in a worker process: writes the image atomically so readers never see half a file."""
+    image = pio.to_image(fig, format=fmt, width=width, height=height)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(image)
+    os.replace(tmp, path)
+
+
+def _job_id(kind, year, fmt, width, height, version):
+    key = f"{kind}|{year}|{fmt}|{width}|{height}|{version}"
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def _path(job_id, fmt):
+    return os.path.join(IMAGE_DIR, f"{job_id}.{fmt}")
+
+
+def submit(kind, year, fmt="png", width=None, height=None):
+    """
+    Queues an export of a prebuilt choropleth (see climate_figures.BUILDERS).
+    Returns a job dict for result(), or {"error": ...} if the queue is full.
+    """
+    year = int(year)
+    job_id = _job_id(kind, year, fmt, width, height, dataset_version())
+    job = {"id": job_id, "fmt": fmt, "filename": f"map_{year}.{fmt}"}
+    path = _path(job_id, fmt)
+
+    with _lock:
+        _counts["submitted"] += 1
+        if job_id in _jobs:
+            _counts["deduplicated"] += 1
+            return job
+        if os.path.exists(path):
+            _counts["disk_hits"] += 1
+            try:
+                os.utime(path)  # recently used, keep it through evict()
+            except FileNotFoundError:
+                pass
+            else:
+                return job
+        if len(_jobs) >= EXPORT_MAX_PENDING:
+            return {"error": "Too many exports in progress, please try again shortly."}
+        os.makedirs(IMAGE_DIR, exist_ok=True)
+        future = _executor().submit(_render, choropleth(kind, year), path, fmt, width, height)
+        _jobs[job_id] = future
+    future.add_done_callback(lambda f: _finish(job_id, f))
+    return job
+
+
+def _finish(job_id, future):
+    with _lock:
+        _counts["failed" if future.exception() else "completed"] += 1
+        # failed jobs stay until result() reports them; finished ones are served from disk
+        if not future.exception():
+            _jobs.pop(job_id, None)
+    if not future.exception():
+        evict()
+
+
+def evict(max_bytes=None):
+    """Deletes the least recently used images until IMAGE_DIR fits in max_bytes."""
+    max_bytes = EXPORT_IMAGE_MAX_BYTES if max_bytes is None else max_bytes
+    files = _image_files()
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except FileNotFoundError:
+            pass
+
+
+def _image_files():
+    try:
+        names = os.listdir(IMAGE_DIR)
+    except FileNotFoundError:
+        return []
+    files = []
+    for name in names:
+        if name.endswith(".tmp"):
+            continue
+        path = os.path.join(IMAGE_DIR, name)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        files.append((st.st_mtime, st.st_size, path))
+    return files
+
+
+def result(job):
+    """{"status": "pending"}, {"status": "done", "path": ...} or {"error": ...}."""
+    path = _path(job["id"], job["fmt"])
+    with _lock:
+        future = _jobs.get(job["id"])
+        if future is not None and future.done() and future.exception():
+            _jobs.pop(job["id"], None)
+            return {"error": f"Export failed: {future.exception()}"}
+    if os.path.exists(path):
+        return {"status": "done", "path": path}
+    if future is None:
+        # not running and not on disk (e.g. the file was removed): let the caller resubmit
+        return {"error": "Export expired, please try again."}
+    return {"status": "pending"}
+
+
+def stats():
+    with _lock:
+        counts = dict(_counts, pending=len(_jobs), workers=EXPORT_WORKERS)
+    files = _image_files()
+    return dict(counts, files=len(files), bytes=sum(size for _, size, _ in files), max_bytes=EXPORT_IMAGE_MAX_BYTES)
+
+
+metrics.register("image_exports", stats)
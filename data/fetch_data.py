@@ -1,118 +1,292 @@
+import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from dotenv import load_dotenv
-from datetime import datetime
+
+from data import circuit_breaker, forecast, metrics, popularity, rate_limit, upstream
+from data.cache import TTLCache
+from data.singleflight import SingleFlight
 
 load_dotenv()
 API_KEY = os.getenv("OPENWEATHER_API_KEY")
 
-# --- Function to get real-time temperature (from original dashboard.py) ---
-import requests
-import os
+logger = logging.getLogger(__name__)
+
+# --- Shared cache for live weather readings ---
+# Keyed on the normalized city name so every page reuses the same reading.
+# For WEATHER_STALE_SECONDS after expiry a reading is still served at once
+# while a background worker fetches a fresh one (0 turns this off).
+WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", "300"))
+WEATHER_CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "512"))
+WEATHER_STALE_SECONDS = int(os.getenv("WEATHER_STALE_SECONDS", "600"))
+_weather_cache = TTLCache(ttl=WEATHER_CACHE_TTL, max_entries=WEATHER_CACHE_MAX_ENTRIES, stale_ttl=WEATHER_STALE_SECONDS)
+metrics.register("weather_cache", _weather_cache.stats)
+
+# Coalesces concurrent identical OpenWeather requests (see data/singleflight.py)
+_flight = SingleFlight()
+metrics.register("openweather_singleflight", _flight.stats)
+
+# --- OpenWeather quota ---
+# Every page and the background refresh share one API key, so each upstream
+# call (cache misses only, after coalescing) takes a token from one bucket.
+# Interactive lookups queue ahead of background prefetch; see data/rate_limit.py
+# for the OPENWEATHER_* settings.
+_quota = rate_limit.from_env("OPENWEATHER", rate_per_minute=60, burst=10, background_reserve=4)
+metrics.register("openweather_rate_limit", _quota.stats)
+QUOTA_ERROR = "Weather service is busy right now. Please try again in a few seconds."
+SLOW_ERROR = "Weather service is responding slowly. Please try again in a few seconds."
+
+# --- Background revalidation and popularity ---
+# Stale hits are refreshed on a small worker pool (one refresh per key at a
+# time, at background priority). Interactive city lookups are counted per
+# endpoint so data/city_warmer.py can keep the most requested cities warm.
+REVALIDATE_WORKERS = int(os.getenv("REVALIDATE_WORKERS", "2"))
+HOT_CITIES = int(os.getenv("HOT_CITIES", "20"))
+_revalidate_pool = ThreadPoolExecutor(max_workers=REVALIDATE_WORKERS, thread_name_prefix="revalidate")
+_revalidating = set()
+_revalidate_lock = threading.Lock()
+_revalidate_stats = {"submitted": 0, "skipped_in_flight": 0, "failed": 0}
+_popular = {"weather": popularity.TopK(k=HOT_CITIES), "forecast": popularity.TopK(k=HOT_CITIES)}
+
+
+def _normalize_city(city):
+    """Collapses whitespace and case so 'new  Delhi' and 'New Delhi' share an entry."""
+    return " ".join(str(city).split()).casefold()
+
+
+def _revalidate(flight_key, fn, *args):
+    """Refreshes a cache entry on the background pool unless a refresh for it is already running."""
+    with _revalidate_lock:
+        if flight_key in _revalidating:
+            _revalidate_stats["skipped_in_flight"] += 1
+            return
+        _revalidating.add(flight_key)
+        _revalidate_stats["submitted"] += 1
+
+    def run():
+        try:
+            result = _flight.do(flight_key, fn, *args)
+            if "error" in result:
+                _revalidate_stats["failed"] += 1
+        except Exception as e:
+            _revalidate_stats["failed"] += 1
+            logger.info("Background refresh of %s failed: %s", flight_key, e)
+        finally:
+            with _revalidate_lock:
+                _revalidating.discard(flight_key)
+
+    _revalidate_pool.submit(run)
+
+
+def _lookup(priority, budget, cache, flight_key, fn, *args):
+    """
+    Runs a coalesced upstream lookup. Interactive callers join the flight from
+    their own thread and wait on it for at most their time budget (the lookup
+    keeps going and fills the cache); while the OpenWeather circuit is open
+    they get an "unavailable" error at once.
+    """
+    breaker = circuit_breaker.breaker("openweather")
+    if breaker.state == circuit_breaker.OPEN:
+        raise circuit_breaker.CircuitOpenError(breaker.name, breaker.retry_in())
+    if priority != rate_limit.INTERACTIVE:
+        return _flight.do(flight_key, fn, *args)
+
+    cache_key = flight_key[1]
+
+    def lead():
+        # a caller that missed the cache just before the previous flight for
+        # this key finished must not call upstream again
+        remaining = cache.expires_in(cache_key)
+        if remaining is not None and remaining > 0:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+        return fn(*args)
+
+    try:
+        call = _flight.start(flight_key, circuit_breaker.upstream_pool.submit, lead)
+        if not circuit_breaker.upstream_pool.wait(call.done, budget):
+            return {"error": SLOW_ERROR}
+        # followers that joined before the leader's submit failed get its PoolBusy here
+        return call.outcome()
+    except circuit_breaker.PoolBusy:
+        return {"error": SLOW_ERROR}
+
+
+def _unavailable(e):
+    return {"error": f"Live weather is temporarily unavailable. Please try again in {max(1, round(e.retry_in))}s."}
+
+
+def hot_cities(kind, n=None):
+    """Most requested (normalized) city names for "weather" or "forecast", hottest first."""
+    return [city for city, _ in _popular[kind].top(n)]
+
+
+def refresh(kind, city, lead_seconds=0):
+    """
+    Fetches city's weather or forecast in the background unless its cache
+    entry stays fresh for more than lead_seconds. Used by the warmer.
+    """
+    cache_key = _normalize_city(city)
+    cache = _weather_cache if kind == "weather" else _forecast_cache
+    remaining = cache.expires_in(cache_key)
+    if remaining is not None and remaining > lead_seconds:
+        return False
+    if kind == "weather":
+        _revalidate(("weather", cache_key), _fetch_weather, {"q": city}, cache_key, rate_limit.BACKGROUND)
+    else:
+        _revalidate(("forecast", cache_key), _fetch_forecast, city, cache_key, rate_limit.BACKGROUND)
+    return True
 
+
+def _revalidate_metrics():
+    with _revalidate_lock:
+        in_flight = len(_revalidating)
+    return dict(
+        _revalidate_stats,
+        in_flight=in_flight,
+        hot_weather=_popular["weather"].stats(),
+        hot_forecast=_popular["forecast"].stats(),
+    )
+
+
+metrics.register("openweather_revalidate", _revalidate_metrics)
+
+
+# --- Function to get real-time temperature (from original dashboard.py) ---
+# Reads through the same cache as get_real_time_weather_data, since both hit
+# the OpenWeather /weather endpoint.
 def get_real_time_temperature(city):
     API_KEY = os.getenv("OPENWEATHER_API_KEY")
     if not API_KEY:
         return "Error: API key not found in environment variables."
 
-    base_url = "http://api.openweathermap.org/data/2.5/weather?"
-    complete_url = f"{base_url}q={city}&appid={API_KEY}&units=metric"
-    
-    try:
-        response = requests.get(complete_url)
-        response.raise_for_status() # Raises an HTTPError for bad responses
-        data = response.json()
-    except requests.exceptions.RequestException as e:
-        return f"Error connecting to API: {e}"
-
-    if data.get("cod") == 200:
-        main = data["main"]
-        temp = main["temp"]
-        return temp # Return the number directly
-    else:
+    weather_data = get_real_time_weather_data(city)
+    if "error" in weather_data:
         # Return a string message on error
-        return f"Error: City '{city}' not found or invalid response."
+        return f"Error: {weather_data['error']}"
+    return weather_data["temp_celsius"] # Return the number directly
+
 # --- Function to get all real-time weather data for a single city ---
-# This is the function used in humidity.py, rainfall.py, wind.py and seasonal.py
-def get_real_time_weather_data(city):
-    base_url = "http://api.openweathermap.org/data/2.5/weather?"
+# This is the function used in humidity.py, rainfall.py, wind.py and seasonal.py.
+# lat/lon can be given instead of a city name (used by the live state refresh).
+# priority is rate_limit.INTERACTIVE for user lookups, BACKGROUND for prefetch;
+# budget caps how long an interactive caller waits (CALLBACK_BUDGET_SECONDS by default).
+def get_real_time_weather_data(city=None, lat=None, lon=None, priority=rate_limit.INTERACTIVE, budget=None):
     try:
         if not API_KEY:
             return {"error": "API Key not found. Please check your .env file."}
 
-        url = f"{base_url}q={city}&appid={API_KEY}&units=metric"
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        data = response.json()
-        
-        if data.get("cod") != 200:
-            return {"error": data.get("message", "City not found.")}
-
-        weather_info = {
-            "city": data['name'],
-            "lat": data['coord']['lat'],
-            "lon": data['coord']['lon'],
-            "temp_celsius": data['main']['temp'],
-            "humidity_percent": data['main']['humidity'],
-            "weather_desc": data['weather'][0]['description'].capitalize(),
-            # Wind data is in m/s, convert to km/h for readability
-            "wind_speed_kmh": round(data['wind']['speed'] * 3.6, 2),
-            "wind_speed_mps": data['wind']['speed'],
-            "wind_direction_deg": data['wind'].get('deg', 'N/A')
-        }
-        
-        # Add rainfall data if available, it's often optional in the API response
-        if 'rain' in data and '1h' in data['rain']:
-            weather_info['rain_1h'] = data['rain']['1h']
-        elif 'rain' in data and '3h' in data['rain']:
-            weather_info['rain_3h'] = data['rain']['3h']
-            
-        return weather_info
-    
+        if lat is not None and lon is not None:
+            cache_key = f"@{float(lat):.2f},{float(lon):.2f}"
+            location = {"lat": lat, "lon": lon}
+        else:
+            cache_key = _normalize_city(city)
+            location = {"q": city}
+            if priority == rate_limit.INTERACTIVE:
+                _popular["weather"].touch(cache_key)
+        cached, stale = _weather_cache.get_stale(cache_key)
+        if cached is not None:
+            if stale:
+                _revalidate(("weather", cache_key), _fetch_weather, location, cache_key, rate_limit.BACKGROUND)
+            return dict(cached)
+
+        # Concurrent callers asking for the same city share one upstream request
+        return dict(_lookup(priority, budget, _weather_cache, ("weather", cache_key), _fetch_weather, location, cache_key, priority))
+
+    except circuit_breaker.CircuitOpenError as e:
+        return _unavailable(e)
     except requests.exceptions.RequestException as e:
         return {"error": f"API request error: {e}"}
     except Exception as e:
         return {"error": f"An unexpected error occurred: {e}"}
 
+
+def _fetch_weather(location, cache_key, priority):
+    if not _quota.acquire(priority):
+        return {"error": QUOTA_ERROR}
+    base_url = "http://api.openweathermap.org/data/2.5/weather"
+    params = {**location, "appid": API_KEY, "units": "metric"}
+    response = upstream.get(base_url, params=params)
+    response.raise_for_status()  # Raise an exception for HTTP errors
+    data = response.json()
+
+    if data.get("cod") != 200:
+        return {"error": data.get("message", "City not found.")}
+
+    weather_info = {
+        "city": data['name'],
+        "lat": data['coord']['lat'],
+        "lon": data['coord']['lon'],
+        "temp_celsius": data['main']['temp'],
+        "humidity_percent": data['main']['humidity'],
+        "weather_desc": data['weather'][0]['description'].capitalize(),
+        # Wind data is in m/s, convert to km/h for readability
+        "wind_speed_kmh": round(data['wind']['speed'] * 3.6, 2),
+        "wind_speed_mps": data['wind']['speed'],
+        "wind_direction_deg": data['wind'].get('deg', 'N/A')
+    }
+
+    # Add rainfall data if available, it's often optional in the API response
+    if 'rain' in data and '1h' in data['rain']:
+        weather_info['rain_1h'] = data['rain']['1h']
+    elif 'rain' in data and '3h' in data['rain']:
+        weather_info['rain_3h'] = data['rain']['3h']
+
+    _weather_cache.set(cache_key, weather_info)
+    return weather_info
+
 # --- Function to get 5-day forecast data ---
-# This function is used in projection.py
-def get_5_day_forecast_data(city):
-    """Fetches a 5-day, 3-hour forecast for a given city."""
-    base_url = "http://api.openweathermap.org/data/2.5/forecast?"
+# This function is used in projection.py. Parsed forecasts are cached per city
+# until the provider's next forecast run (see data/forecast.py), then served
+# stale for up to FORECAST_STALE_SECONDS while a fresh one is fetched.
+FORECAST_CACHE_MAX_ENTRIES = int(os.getenv("FORECAST_CACHE_MAX_ENTRIES", "256"))
+FORECAST_STALE_SECONDS = int(os.getenv("FORECAST_STALE_SECONDS", "3600"))
+_forecast_cache = TTLCache(ttl=forecast.SLOT_SECONDS, max_entries=FORECAST_CACHE_MAX_ENTRIES, stale_ttl=FORECAST_STALE_SECONDS)
+metrics.register("forecast_cache", _forecast_cache.stats)
+
+
+def get_5_day_forecast_data(city, budget=None):
+    """
+    5-day forecast for a city: per-day min/max/mean temperature, total
+    precipitation and peak wind ("forecast"), plus the 3-hourly "series".
+    """
     try:
         if not API_KEY:
             return {"error": "API Key not found. Please check your .env file."}
 
-        url = f"{base_url}q={city}&appid={API_KEY}&units=metric"
-        response = requests.get(url)
-        response.raise_for_status() # Raise an exception for HTTP errors
-        data = response.json()
-        
-        if data.get("cod") != "200":
-            return {"error": data.get("message", "City not found.")}
-
-        forecast_list = data["list"]
-        forecast_data = []
-        
-        # OpenWeatherMap provides 3-hour intervals, we'll take one per day for simplicity
-        seen_dates = set()
-        for item in forecast_list:
-            timestamp = datetime.fromtimestamp(item['dt'])
-            date_str = timestamp.strftime('%Y-%m-%d')
-            
-            if date_str not in seen_dates:
-                seen_dates.add(date_str)
-                forecast_data.append({
-                    "date": timestamp.strftime('%a, %b %d'),
-                    "temp_celsius": item['main']['temp'],
-                    "weather_desc": item['weather'][0]['description'].capitalize(),
-                    "humidity_percent": item['main']['humidity'],
-                    "wind_speed_kmh": round(item['wind']['speed'] * 3.6, 2)
-                })
-        
-        return {"city": data['city']['name'], "forecast": forecast_data}
-    
+        cache_key = _normalize_city(city)
+        _popular["forecast"].touch(cache_key)
+        cached, stale = _forecast_cache.get_stale(cache_key)
+        if cached is not None:
+            if stale:
+                _revalidate(("forecast", cache_key), _fetch_forecast, city, cache_key, rate_limit.BACKGROUND)
+            return cached
+        return _lookup(rate_limit.INTERACTIVE, budget, _forecast_cache, ("forecast", cache_key), _fetch_forecast, city, cache_key, rate_limit.INTERACTIVE)
+
+    except circuit_breaker.CircuitOpenError as e:
+        return _unavailable(e)
     except requests.exceptions.RequestException as e:
         return {"error": f"API request error: {e}"}
     except Exception as e:
-        return {"error": f"An unexpected error occurred: {e}"}
\ No newline at end of file
+        return {"error": f"An unexpected error occurred: {e}"}
+
+
+def _fetch_forecast(city, cache_key, priority):
+    if not _quota.acquire(priority):
+        return {"error": QUOTA_ERROR}
+    base_url = "http://api.openweathermap.org/data/2.5/forecast"
+    params = {"q": city, "appid": API_KEY, "units": "metric"}
+    response = upstream.get(base_url, params=params)
+    response.raise_for_status() # Raise an exception for HTTP errors
+    data = response.json()
+
+    if data.get("cod") != "200":
+        return {"error": data.get("message", "City not found.")}
+
+    result = forecast.summarize(data)
+    _forecast_cache.set(cache_key, result, ttl=forecast.seconds_until_next_issuance(data))
+    return result
@@ -0,0 +1,100 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+# --- 5-day / 3-hour forecast: columnar parsing and daily aggregation ---
+# The OpenWeather /forecast response is turned into one array per field (40
+# slots), and days are formed in the city's own timezone (the response's
+# city.timezone offset), not the server's. Daily values are group
+# aggregations over every slot of the day rather than the first slot seen.
+SLOT_SECONDS = 3 * 3600
+# A new forecast run is published roughly every SLOT_SECONDS; never cache for less than this
+MIN_CACHE_SECONDS = 60
+
+
+def parse(data):
+    """Columnar DataFrame of the forecast slots: time (city-local), temp, humidity, wind, precip, weather."""
+    slots = data["list"]
+    offset = int(data["city"].get("timezone", 0))
+    dt = np.fromiter((s["dt"] for s in slots), dtype="int64", count=len(slots))
+    return pd.DataFrame({
+        "dt": dt,
+        # wall-clock time in the city, as a naive timestamp
+        "time": pd.to_datetime(dt + offset, unit="s"),
+        "temp": np.fromiter((s["main"]["temp"] for s in slots), dtype="float64", count=len(slots)),
+        "humidity": np.fromiter((s["main"]["humidity"] for s in slots), dtype="float64", count=len(slots)),
+        "wind": np.fromiter((s["wind"]["speed"] for s in slots), dtype="float64", count=len(slots)),
+        # rain and snow are only present when some fell in the 3 h slot
+        "precip": np.fromiter(
+            (s.get("rain", {}).get("3h", 0.0) + s.get("snow", {}).get("3h", 0.0) for s in slots),
+            dtype="float64", count=len(slots),
+        ),
+        "weather": [s["weather"][0]["description"].capitalize() for s in slots],
+    })
+
+
+def daily(slots):
+    """
+    One row per city-local day: temp min/max/mean, mean humidity, total
+    precipitation, peak wind, and the weather described nearest to midday.
+    """
+    day = slots["time"].dt.normalize()
+    grouped = slots.groupby(day)
+    days = grouped.agg(
+        temp_min=("temp", "min"),
+        temp_max=("temp", "max"),
+        temp_mean=("temp", "mean"),
+        humidity_mean=("humidity", "mean"),
+        precip_mm=("precip", "sum"),
+        wind_max=("wind", "max"),
+        slots=("temp", "size"),
+    )
+    from_noon = (slots["time"].dt.hour - 12).abs()
+    days["weather"] = slots.loc[from_noon.groupby(day).idxmin(), "weather"].to_numpy()
+    return days.reset_index(names="day")
+
+
+def summarize(data):
+    """The forecast as plain data: per-day cards plus the full 3-hourly series for charting."""
+    slots = parse(data)
+    days = daily(slots)
+    forecast = [
+        {
+            "date": day.strftime("%a, %b %d"),
+            "temp_min": round(float(tmin), 1),
+            "temp_max": round(float(tmax), 1),
+            "temp_celsius": round(float(tmean), 1),
+            "humidity_percent": round(float(hum)),
+            "precip_mm": round(float(precip), 1),
+            "wind_speed_kmh": round(float(wind) * 3.6, 2),
+            "weather_desc": weather,
+            "slots": int(n),
+        }
+        for day, tmin, tmax, tmean, hum, precip, wind, n, weather in zip(
+            days["day"], days["temp_min"], days["temp_max"], days["temp_mean"], days["humidity_mean"],
+            days["precip_mm"], days["wind_max"], days["slots"], days["weather"],
+        )
+    ]
+    return {
+        "city": data["city"]["name"],
+        "timezone_offset": int(data["city"].get("timezone", 0)),
+        "forecast": forecast,
+        "series": {
+            "time": slots["time"].dt.strftime("%Y-%m-%dT%H:%M").tolist(),
+            "temp_celsius": slots["temp"].round(1).tolist(),
+            "precip_mm": slots["precip"].round(2).tolist(),
+            "wind_speed_kmh": (slots["wind"] * 3.6).round(1).tolist(),
+        },
+    }
+
+
+def seconds_until_next_issuance(data, now=None):
+    """
+    How long a parsed forecast stays current. Once its first slot has started
+    the provider has published a newer run, so cache until then.
+    """
+    now = time.time() if now is None else now
+    slots = data.get("list") or []
+    first = slots[0]["dt"] if slots else now + SLOT_SECONDS
+    return max(MIN_CACHE_SECONDS, min(SLOT_SECONDS, first - now))
@@ -0,0 +1,222 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data.spatial_index import SpatialIndex
+
+# --- Indian states and cities shared by the map pages ---
+# One table of state points with every sample metric as a column (rainfall,
+# temperature, wind and humidity pages all read from it), plus major cities
+# tagged with their state. A spatial index over both resolves a live lookup's
+# lat/lon to the nearest state in O(log N), so a page can jump to it.
+#
+# Sample annual averages: rainfall (mm), temp (°C), wind (m/s), wind_dir
+# (the compass direction the wind blows toward, 0 = north, 90 = east),
+# humidity (%). None = no sample value.
+# Live readings from data/live_refresh.py replace temp, wind, wind_dir and
+# humidity when available, and add rain_now (mm in the last 1-3 h).
+STATE_COLUMNS = ["state", "lat", "lon", "rainfall", "temp", "wind", "wind_dir", "humidity"]
+_STATES = [
+    ("Andhra Pradesh", 16.51, 80.62, 900, 28.0, 3.5, 90, None),
+    ("Arunachal Pradesh", 27.09, 93.61, 2150, 18.5, 2.8, 200, None),
+    ("Assam", 26.15, 91.77, 1800, 24.0, 3.2, 180, None),
+    ("Bihar", 25.61, 85.13, 1200, 26.5, 2.5, 160, 69),
+    ("Chhattisgarh", 21.25, 81.63, 1300, 25.0, 2.7, 140, None),
+    ("Goa", 15.49, 73.83, 3000, 27.5, 4.1, 80, None),
+    ("Gujarat", 23.22, 72.65, 800, 27.0, 4.5, 70, 52),
+    ("Haryana", 29.06, 76.08, 620, 25.5, 3.0, 120, 64),
+    ("Himachal Pradesh", 31.10, 77.17, 1250, 15.0, 2.3, 100, 55),
+    ("Jharkhand", 23.34, 85.33, 1400, 25.5, 2.6, 150, None),
+    ("Karnataka", 12.97, 77.59, 1200, 26.0, 3.4, 90, 66),
+    ("Kerala", 8.52, 76.92, 3000, 27.8, 3.8, 85, None),
+    ("Madhya Pradesh", 23.25, 77.41, 1000, 26.0, 2.9, 130, None),
+    ("Maharashtra", 19.07, 72.87, 1100, 27.0, 3.9, 95, 58),
+    ("Manipur", 24.82, 93.94, 1400, 23.5, 2.7, 190, None),
+    ("Meghalaya", 25.57, 91.88, 2800, 20.5, 2.6, 180, None),
+    ("Mizoram", 23.73, 92.72, 2500, 23.0, 2.9, 200, None),
+    ("Nagaland", 25.67, 94.12, 1600, 22.5, 2.8, 200, None),
+    ("Odisha", 20.27, 85.84, 1450, 27.0, 3.1, 100, None),
+    ("Punjab", 30.74, 76.79, 600, 24.5, 3.2, 110, 68),
+    ("Rajasthan", 26.91, 75.79, 500, 27.0, 4.0, 60, 40),
+    ("Sikkim", 27.33, 88.61, 2800, 16.5, 2.2, 190, None),
+    ("Tamil Nadu", 13.08, 80.27, 900, 28.0, 4.2, 80, None),
+    ("Telangana", 17.38, 78.48, 900, 27.0, 3.3, 95, None),
+    ("Tripura", 23.84, 91.28, 2000, 25.0, 2.7, 180, None),
+    ("Uttar Pradesh", 26.85, 80.95, 1000, 26.5, 2.8, 140, 60),
+    ("Uttarakhand", 30.32, 78.03, 1500, 18.0, 2.4, 120, None),
+    ("West Bengal", 22.57, 88.36, 1600, 26.5, 3.0, 180, 72),
+    ("Jammu & Kashmir", 34.08, 74.79, 800, 10.5, 2.5, 250, None),
+    ("Ladakh", 34.16, 77.58, 100, 2.0, 5.0, 270, None),
+    ("Delhi", 28.70, 77.10, None, None, None, None, 70),
+]
+
+CITY_COLUMNS = ["city", "state", "lat", "lon"]
+_CITIES = [
+    ("Visakhapatnam", "Andhra Pradesh", 17.687, 83.219),
+    ("Vijayawada", "Andhra Pradesh", 16.506, 80.648),
+    ("Itanagar", "Arunachal Pradesh", 27.084, 93.605),
+    ("Guwahati", "Assam", 26.144, 91.736),
+    ("Patna", "Bihar", 25.594, 85.138),
+    ("Raipur", "Chhattisgarh", 21.251, 81.630),
+    ("Panaji", "Goa", 15.491, 73.828),
+    ("Ahmedabad", "Gujarat", 23.023, 72.571),
+    ("Surat", "Gujarat", 21.170, 72.831),
+    ("Gurugram", "Haryana", 28.459, 77.027),
+    ("Shimla", "Himachal Pradesh", 31.105, 77.173),
+    ("Ranchi", "Jharkhand", 23.344, 85.310),
+    ("Bengaluru", "Karnataka", 12.972, 77.595),
+    ("Mysuru", "Karnataka", 12.296, 76.639),
+    ("Thiruvananthapuram", "Kerala", 8.524, 76.937),
+    ("Kochi", "Kerala", 9.931, 76.267),
+    ("Bhopal", "Madhya Pradesh", 23.260, 77.413),
+    ("Indore", "Madhya Pradesh", 22.720, 75.858),
+    ("Mumbai", "Maharashtra", 19.076, 72.877),
+    ("Pune", "Maharashtra", 18.520, 73.856),
+    ("Nagpur", "Maharashtra", 21.146, 79.088),
+    ("Imphal", "Manipur", 24.817, 93.937),
+    ("Shillong", "Meghalaya", 25.578, 91.893),
+    ("Aizawl", "Mizoram", 23.727, 92.718),
+    ("Kohima", "Nagaland", 25.675, 94.109),
+    ("Bhubaneswar", "Odisha", 20.296, 85.825),
+    ("Ludhiana", "Punjab", 30.901, 75.857),
+    ("Amritsar", "Punjab", 31.634, 74.872),
+    ("Jaipur", "Rajasthan", 26.912, 75.787),
+    ("Jodhpur", "Rajasthan", 26.238, 73.024),
+    ("Gangtok", "Sikkim", 27.339, 88.606),
+    ("Chennai", "Tamil Nadu", 13.083, 80.271),
+    ("Coimbatore", "Tamil Nadu", 11.017, 76.956),
+    ("Madurai", "Tamil Nadu", 9.925, 78.120),
+    ("Hyderabad", "Telangana", 17.385, 78.487),
+    ("Agartala", "Tripura", 23.831, 91.287),
+    ("Lucknow", "Uttar Pradesh", 26.847, 80.947),
+    ("Kanpur", "Uttar Pradesh", 26.449, 80.332),
+    ("Varanasi", "Uttar Pradesh", 25.318, 82.974),
+    ("Agra", "Uttar Pradesh", 27.177, 78.008),
+    ("Dehradun", "Uttarakhand", 30.317, 78.032),
+    ("Kolkata", "West Bengal", 22.573, 88.364),
+    ("Siliguri", "West Bengal", 26.727, 88.395),
+    ("Srinagar", "Jammu & Kashmir", 34.084, 74.797),
+    ("Jammu", "Jammu & Kashmir", 32.727, 74.857),
+    ("Leh", "Ladakh", 34.153, 77.577),
+    ("New Delhi", "Delhi", 28.614, 77.209),
+]
+
+# A lookup farther than this from every known point is not in India
+MAX_NEAREST_KM = 400.0
+
+_states = pd.DataFrame(_STATES, columns=STATE_COLUMNS)
+# Bumped whenever metric values change, so derived data (surfaces) can be cached per version
+_version = 1
+# state -> {metric: value} from the last live refresh, replaced as a whole
+_live = {}
+_live_at = None
+LIVE_METRICS = ("temp", "wind", "wind_dir", "humidity", "rain_now")
+_cities = pd.DataFrame(_CITIES, columns=CITY_COLUMNS)
+_indexes = {}  # (metric or None, data version) -> (SpatialIndex, state name per point)
+_index_lock = threading.Lock()
+_maps = {}  # map name -> (data version, figure, map_states)
+_maps_lock = threading.Lock()
+
+
+def state_table(*metrics, extra=()):
+    """
+    state, lat, lon and the given metric columns, for the states that have all
+    of them, plus any extra columns (which may be missing). Live values are
+    used where a refresh has provided them. Returns a new frame, so callers
+    hold a consistent snapshot.
+    """
+    table = _states.assign(rain_now=np.nan)
+    live = _live
+    if live:
+        for metric in LIVE_METRICS:
+            values = table["state"].map(lambda s: live.get(s, {}).get(metric))
+            table[metric] = pd.to_numeric(values, errors="coerce").fillna(table[metric])
+    table = table[["state", "lat", "lon", *metrics, *extra]]
+    if metrics:
+        table = table.dropna(subset=list(metrics))
+    return table.reset_index(drop=True)
+
+
+def update_live(readings):
+    """Replaces the live values ({state: {metric: value}}) and bumps the data version."""
+    global _live, _live_at, _version
+    _live = {state: dict(values) for state, values in readings.items()}
+    _live_at = time.time()
+    _version += 1
+
+
+def live_status():
+    """(number of states with live values, unix time of the last update or None)."""
+    return len(_live), _live_at
+
+
+def data_version():
+    """Increments every time metric values change."""
+    return _version
+
+
+def cities():
+    return _cities.copy()
+
+
+# --- State map figures, built once per data version ---
+# The map pages (rainfall, temperature, wind) pass a builder that turns the
+# state table into a figure; pages then only ever copy the cached figure
+# into their layout, and never wait on upstream.
+def state_map(name, build, metrics, extra=(), trace=0):
+    """
+    (figure, map_states) for the current data version. build(states) gets
+    state_table(*metrics, extra=extra) and runs at most once per version,
+    under a lock. The marker trace (index trace) gets the highlight style for
+    the state picked in the dropdown (set via selectedpoints), and map_states
+    ({"trace": trace, "states": {state: [point index, lat, lon]}}) drives the
+    clientside pan callback.
+    """
+    version = _version
+    entry = _maps.get(name)
+    if entry is None or entry[0] != version:
+        with _maps_lock:
+            entry = _maps.get(name)
+            if entry is None or entry[0] != version:
+                states = state_table(*metrics, extra=extra)
+                fig = build(states)
+                fig.data[trace].update(selected=dict(marker=dict(opacity=1.0)), unselected=dict(marker=dict(opacity=0.4)))
+                points = {s["state"]: [i, s["lat"], s["lon"]] for i, s in enumerate(states.to_dict("records"))}
+                entry = _maps[name] = (version, fig, {"trace": trace, "states": points})
+    return entry[1], entry[2]
+
+
+def _index_for(metric):
+    # live refreshes can add states with a metric, so indexes are per data version
+    key = (metric, _version)
+    entry = _indexes.get(key)
+    if entry is None:
+        with _index_lock:
+            entry = _indexes.get(key)
+            if entry is None:
+                for old in [k for k in _indexes if k[1] != key[1]]:
+                    del _indexes[old]
+                states = state_table(metric) if metric else state_table()
+                towns = _cities[_cities["state"].isin(states["state"])]
+                lat = np.concatenate([states["lat"].to_numpy(), towns["lat"].to_numpy()])
+                lon = np.concatenate([states["lon"].to_numpy(), towns["lon"].to_numpy()])
+                names = np.concatenate([states["state"].to_numpy(), towns["state"].to_numpy()])
+                entry = _indexes[key] = (SpatialIndex(lat, lon), names)
+    return entry
+
+
+def nearest_state(lat, lon, metric=None):
+    """
+    Name of the state closest to (lat, lon), judged by state points and the
+    cities in them. With metric, only states that have a value for it count.
+    Returns None when nothing is within MAX_NEAREST_KM.
+    """
+    if lat is None or lon is None:
+        return None
+    index, names = _index_for(metric)
+    i, distance_km = index.nearest(lat, lon)
+    if distance_km > MAX_NEAREST_KM:
+        return None
+    return str(names[i])
@@ -0,0 +1,134 @@
+import base64
+import os
+import struct
+import zlib
+
+import numpy as np
+from plotly.colors import get_colorscale, sample_colorscale
+
+from data import metrics
+from data.cache import ByteBudgetLRU
+from data.geo_registry import data_version, state_table
+from data.spatial_index import SpatialIndex
+
+# --- Interpolated metric surfaces for the state maps ---
+# Inverse-distance-weighted interpolation of the state readings onto a
+# regular lat/lon grid over India. Each grid point only looks at its k
+# nearest states (via the spatial index), so the whole grid is computed in a
+# few array operations. Surfaces are cached per (metric, resolution, registry
+# data version) and drawn as a PNG image layer under the markers, one pixel
+# per grid cell, so the colors are the interpolated values themselves at any
+# zoom. Grid rows are spaced evenly in web-mercator y, because the map
+# stretches an image layer linearly between its corner coordinates.
+INDIA_BOUNDS = (6.0, 37.5, 68.0, 97.5)  # lat_min, lat_max, lon_min, lon_max
+SURFACE_RESOLUTION_DEG = float(os.getenv("SURFACE_RESOLUTION_DEG", "0.5"))
+IDW_NEIGHBOURS = 6
+IDW_POWER = 2.0
+# Grid points farther than this from every state are left blank (sea, neighbouring countries)
+MAX_DISTANCE_KM = 350.0
+
+_surfaces = ByteBudgetLRU(max_bytes=int(os.getenv("SURFACE_CACHE_MAX_BYTES", str(16 * 1024 * 1024))))
+
+
+def idw(lat, lon, values, grid_lat, grid_lon, k=IDW_NEIGHBOURS, power=IDW_POWER, max_distance_km=MAX_DISTANCE_KM):
+    """
+    Interpolates values at (lat, lon) onto the grid points. Returns an array
+    shaped like grid_lat, NaN where no reading is within max_distance_km.
+    """
+    grid_lat = np.asarray(grid_lat, dtype="float64")
+    values = np.asarray(values, dtype="float64")
+    dist, index = SpatialIndex(lat, lon).query(grid_lat.ravel(), np.asarray(grid_lon, dtype="float64").ravel(), k=k)
+
+    with np.errstate(divide="ignore"):
+        weights = 1.0 / dist ** power
+    # a grid point sitting on a reading takes its value exactly
+    exact = dist[:, 0] < 1e-9
+    weights[exact] = 0.0
+    weights[exact, 0] = 1.0
+
+    z = (weights * values[index]).sum(axis=1) / weights.sum(axis=1)
+    z[dist[:, 0] > max_distance_km] = np.nan
+    return z.reshape(grid_lat.shape)
+
+
+def _mercator_y(lat):
+    return np.log(np.tan(np.pi / 4 + np.radians(lat) / 2))
+
+
+def _mercator_lat(y):
+    return np.degrees(2 * np.arctan(np.exp(y)) - np.pi / 2)
+
+
+def surface(metric, resolution_deg=SURFACE_RESOLUTION_DEG):
+    """
+    (lat, lon, z, (vmin, vmax)) of the interpolated grid: lat per row (north
+    first, evenly spaced in mercator y), lon per column, z shaped (rows, cols)
+    with NaN for blank cells, and the range of the readings it was built from.
+    Cached per data version.
+    """
+    key = (metric, float(resolution_deg), data_version())
+    cached = _surfaces.get(key)
+    if cached is not None:
+        return cached
+
+    lat_min, lat_max, lon_min, lon_max = INDIA_BOUNDS
+    rows = int(round((lat_max - lat_min) / resolution_deg)) + 1
+    lat = _mercator_lat(np.linspace(_mercator_y(lat_max), _mercator_y(lat_min), rows))
+    lon = np.arange(lon_min, lon_max + 1e-9, resolution_deg)
+    grid_lat, grid_lon = np.meshgrid(lat, lon, indexing="ij")
+    states = state_table(metric)
+    z = idw(states["lat"], states["lon"], states[metric], grid_lat, grid_lon)
+    values = states[metric].astype("float64")
+    value_range = (float(values.min()), float(values.max())) if len(values) else (0.0, 1.0)
+    result = (lat, lon, z, value_range)
+    _surfaces.set(key, result, lat.nbytes + lon.nbytes + z.nbytes)
+    return result
+
+
+def _png(rgba):
+    """Encodes an (h, w, 4) uint8 array as a PNG."""
+    height, width = rgba.shape[:2]
+    raw = np.concatenate([np.zeros((height, 1), dtype=np.uint8), rgba.reshape(height, width * 4)], axis=1)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)  # 8-bit RGBA
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)) + chunk(b"IEND", b"")
+
+
+def surface_layer(metric, colorscale, resolution_deg=SURFACE_RESOLUTION_DEG, opacity=0.45):
+    """
+    Mapbox image layer (for layout.mapbox.layers) of the interpolated surface,
+    colored on the readings' own range (the markers' colorbar); blank cells
+    are transparent.
+    """
+    lat, lon, z, (zmin, zmax) = surface(metric, resolution_deg)
+    key = ("png", metric, colorscale, float(resolution_deg), data_version())
+    source = _surfaces.get(key)
+    if source is None:
+        finite = np.isfinite(z)
+        lut = np.array(sample_colorscale(get_colorscale(colorscale), np.linspace(0, 1, 256), colortype="tuple"))
+        level = np.clip((np.nan_to_num(z, nan=zmin) - zmin) / ((zmax - zmin) or 1.0) * 255, 0, 255).astype(np.uint8)
+        rgba = np.empty(z.shape + (4,), dtype=np.uint8)
+        rgba[..., :3] = np.round(lut[level] * 255)
+        rgba[..., 3] = np.where(finite, 255, 0)
+        source = "data:image/png;base64," + base64.b64encode(_png(rgba)).decode("ascii")
+        _surfaces.set(key, source, len(source))
+
+    # cell centres sit on the grid points, so the image extends half a cell past them
+    half = resolution_deg / 2
+    half_y = (_mercator_y(lat[0]) - _mercator_y(lat[-1])) / (len(lat) - 1) / 2 if len(lat) > 1 else 0.0
+    west, east = float(lon[0] - half), float(lon[-1] + half)
+    north = float(_mercator_lat(_mercator_y(lat[0]) + half_y))
+    south = float(_mercator_lat(_mercator_y(lat[-1]) - half_y))
+    return {
+        "sourcetype": "image",
+        "source": source,
+        "coordinates": [[west, north], [east, north], [east, south], [west, south]],
+        "opacity": opacity,
+        "below": "traces",
+    }
+
+
+metrics.register("surface_cache", _surfaces.stats)
@@ -0,0 +1,89 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from data import fetch_data, geo_registry, metrics, rate_limit
+
+# --- Background live refresh of the state maps ---
+# Every LIVE_REFRESH_SECONDS a daemon thread fetches current conditions for
+# every state point through get_real_time_weather_data (so readings also land
+# in the shared weather cache) and publishes them to the geo registry in one
+# swap. Pages only ever read the registry snapshot and never wait on
+# OpenWeather. Requests run on a few workers at background priority, so the
+# OpenWeather rate limiter serves interactive lookups first.
+LIVE_REFRESH_SECONDS = int(os.getenv("LIVE_REFRESH_SECONDS", "900"))
+LIVE_REFRESH_WORKERS = int(os.getenv("LIVE_REFRESH_WORKERS", "4"))
+
+logger = logging.getLogger(__name__)
+
+_thread = None
+_start_lock = threading.Lock()
+_stats = {"runs": 0, "last_ok": 0, "last_failed": 0, "last_duration_s": None, "last_run_at": None}
+
+
+def _reading(row):
+    data = fetch_data.get_real_time_weather_data(lat=row["lat"], lon=row["lon"], priority=rate_limit.BACKGROUND)
+    if "error" in data:
+        return row["state"], None
+    reading = {
+        "temp": data.get("temp_celsius"),
+        "humidity": data.get("humidity_percent"),
+        "rain_now": data.get("rain_1h", data.get("rain_3h", 0.0)),
+    }
+    # OpenWeather reports where the wind blows from; the maps draw where it blows to.
+    # Without a direction the speed is dropped too, so the sample pair stays together.
+    direction = data.get("wind_direction_deg")
+    if isinstance(direction, (int, float)):
+        reading["wind"] = data.get("wind_speed_mps")
+        reading["wind_dir"] = (direction + 180) % 360
+    return row["state"], reading
+
+
+def refresh_once():
+    """Fetches every state concurrently and publishes the readings that succeeded. Returns their count."""
+    started = time.monotonic()
+    rows = geo_registry.state_table().to_dict("records")
+    with ThreadPoolExecutor(max_workers=LIVE_REFRESH_WORKERS, thread_name_prefix="live-refresh") as pool:
+        results = list(pool.map(_reading, rows))
+    readings = {state: values for state, values in results if values is not None}
+    if readings:
+        geo_registry.update_live(readings)
+    _stats.update(
+        runs=_stats["runs"] + 1,
+        last_ok=len(readings),
+        last_failed=len(rows) - len(readings),
+        last_duration_s=round(time.monotonic() - started, 2),
+        last_run_at=time.time(),
+    )
+    return len(readings)
+
+
+def _loop():
+    while True:
+        try:
+            refresh_once()
+        except Exception as e:
+            logger.warning("Live state refresh failed: %s", e)
+        time.sleep(LIVE_REFRESH_SECONDS)
+
+
+def start():
+    """Starts the refresh thread once per process; a no-op without an API key or when disabled."""
+    global _thread
+    if not fetch_data.API_KEY or LIVE_REFRESH_SECONDS <= 0:
+        return False
+    with _start_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_loop, name="live-refresh", daemon=True)
+            _thread.start()
+    return True
+
+
+def stats():
+    live_states, live_at = geo_registry.live_status()
+    return dict(_stats, live_states=live_states, live_at=live_at, running=_thread is not None)
+
+
+metrics.register("live_refresh", stats)
@@ -0,0 +1,24 @@
+import threading
+
+# --- Process-wide metrics registry ---
+# Modules register a zero-argument function returning a dict of their
+# counters; app.py serves the combined snapshot on /metrics.
+_providers = {}
+_lock = threading.Lock()
+
+
+def register(name, provider):
+    with _lock:
+        _providers[name] = provider
+
+
+def snapshot():
+    with _lock:
+        providers = dict(_providers)
+    result = {}
+    for name, provider in providers.items():
+        try:
+            result[name] = provider()
+        except Exception as e:
+            result[name] = {"error": str(e)}
+    return result
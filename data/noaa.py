@@ -0,0 +1,198 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from data import metrics, noaa_store, upstream
+from data.singleflight import SingleFlight
+
+# --- NOAA Tides & Currents water level data (used in sea_lavel.py) ---
+API_URL = "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
+
+# Common NOAA stations (station_id: location name)
+STATIONS = {
+    "8518750": "New York, NY",
+    "9414290": "San Francisco, CA",
+    "8771341": "Galveston, TX",
+    "8410140": "Portland, ME",
+    "8723214": "Naples, FL",
+    "9432780": "Seattle, WA"
+}
+
+logger = logging.getLogger(__name__)
+
+# Month chunks of a year are fetched concurrently on this bounded pool;
+# 12 workers cover a whole year (12 chunks) in about one round-trip
+NOAA_MAX_WORKERS = int(os.getenv("NOAA_MAX_WORKERS", "12"))
+_executor = ThreadPoolExecutor(max_workers=NOAA_MAX_WORKERS, thread_name_prefix="noaa-chunk")
+
+# The current year's stored series is extended at most this often
+NOAA_TAIL_REFRESH_SECONDS = int(os.getenv("NOAA_TAIL_REFRESH_SECONDS", "1800"))
+
+_flight = SingleFlight()
+metrics.register("noaa_singleflight", _flight.stats)
+metrics.register("noaa_store", noaa_store.stats)
+
+# Recent per-chunk latencies, for watching the tail
+_chunk_seconds = deque(maxlen=500)
+_chunk_failures = 0
+_timing_lock = threading.Lock()
+
+
+def fetch_water_levels(station_id, year, datum="MSL"):
+    """
+    Returns a DataFrame (Date_Time, Water_Level) with a year of 6-minute water levels.
+    Completed years are served from the on-disk store; the current year only
+    downloads the tail missing from disk. Concurrent requests for the same
+    station/year/datum share one load.
+    Raises requests.exceptions.RequestException if NOAA cannot be reached.
+    """
+    return _flight.do((station_id, int(year), datum), _load_year, station_id, int(year), datum)
+
+
+def _load_year(station_id, year, datum):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if year > now.year:
+        return _to_frame([])
+
+    stored = noaa_store.load(station_id, year, datum)
+    if year < now.year:
+        if stored is not None and stored.complete:
+            return stored.df
+        df = _download_range(station_id, datum, datetime(year, 1, 1), datetime(year, 12, 31))
+        if not df.attrs["failed_chunks"]:
+            noaa_store.save(station_id, year, datum, df, complete=True)
+        return df
+
+    # Current year: extend the stored series with the days since its last sample
+    if stored is not None and not stored.df.empty:
+        if time.time() - stored.fetched_at < NOAA_TAIL_REFRESH_SECONDS:
+            return stored.df
+        # Re-fetch the last stored day so a partially downloaded day is completed
+        last = stored.df["Date_Time"].iloc[-1]
+        begin = datetime(last.year, last.month, last.day)
+        try:
+            tail = _download_range(station_id, datum, begin, now)
+        except Exception as e:
+            # NOAA down (or its circuit open): keep serving the stored series
+            logger.info("NOAA tail refresh for %s %s failed, serving stored data: %s", station_id, year, e)
+            return stored.df
+        df = pd.concat([stored.df[stored.df["Date_Time"] < begin], tail], ignore_index=True)
+        df.attrs["failed_chunks"] = tail.attrs["failed_chunks"]
+    else:
+        df = _download_range(station_id, datum, datetime(year, 1, 1), now)
+
+    # A gap would never be back-filled by later tail fetches, so only store gapless series
+    if not df.attrs["failed_chunks"]:
+        noaa_store.save(station_id, year, datum, df, complete=False)
+    return df
+
+
+def _chunks(start, end):
+    # NOAA limits 6-minute data to ~31 days per request
+    chunks = []
+    while start <= end:
+        chunk_end = min(start + timedelta(days=30), end)
+        chunks.append((start, chunk_end))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def _fetch_chunk(station_id, datum, begin, end):
+    params = {
+        "begin_date": begin.strftime("%Y%m%d"),
+        "end_date": end.strftime("%Y%m%d"),
+        "station": station_id,
+        "product": "water_level",
+        "datum": datum,
+        "units": "metric",
+        "time_zone": "gmt",
+        "application": "Dash_App",
+        "format": "json"
+    }
+    started = time.perf_counter()
+    try:
+        response = upstream.get(API_URL, params=params)
+        response.raise_for_status()
+        data = response.json()
+        return data.get("data", [])
+    finally:
+        elapsed = time.perf_counter() - started
+        _record_chunk_time(elapsed)
+        logger.debug("NOAA chunk %s %s..%s took %.3fs", station_id, begin.date(), end.date(), elapsed)
+
+
+def _record_chunk_time(seconds):
+    with _timing_lock:
+        _chunk_seconds.append(seconds)
+
+
+def _download_range(station_id, datum, start, end):
+    """
+    Fetches all month chunks of the range concurrently and merges them in date order.
+    Chunks that fail are skipped (listed in df.attrs["failed_chunks"]); if every
+    chunk fails the first error is raised.
+    """
+    global _chunk_failures
+    chunks = _chunks(start, end)
+    futures = [_executor.submit(_fetch_chunk, station_id, datum, begin, end) for begin, end in chunks]
+
+    all_data = []
+    failed = []
+    first_error = None
+    # Futures are consumed in submission order, so the merged records stay in date order
+    for (begin, end), future in zip(chunks, futures):
+        try:
+            all_data.extend(future.result())
+        except Exception as e:
+            failed.append(f"{begin:%Y-%m-%d}..{end:%Y-%m-%d}")
+            first_error = first_error or e
+            logger.warning("NOAA chunk %s %s..%s failed: %s", station_id, begin.date(), end.date(), e)
+
+    if failed:
+        with _timing_lock:
+            _chunk_failures += len(failed)
+        if len(failed) == len(chunks):
+            raise first_error
+
+    df = _to_frame(all_data)
+    df.attrs["failed_chunks"] = failed
+    return df
+
+
+def _timing_stats():
+    with _timing_lock:
+        samples = sorted(_chunk_seconds)
+        failures = _chunk_failures
+    if not samples:
+        return {"chunks": 0, "failures": failures}
+
+    def pct(p):
+        return round(samples[min(len(samples) - 1, int(p * len(samples)))], 3)
+
+    return {
+        "chunks": len(samples),
+        "failures": failures,
+        "p50_seconds": pct(0.50),
+        "p95_seconds": pct(0.95),
+        "p99_seconds": pct(0.99),
+        "max_seconds": round(samples[-1], 3),
+        "workers": NOAA_MAX_WORKERS,
+    }
+
+
+metrics.register("noaa_chunks", _timing_stats)
+
+
+def _to_frame(records):
+    df = pd.DataFrame(records, columns=["t", "v"]) if records else pd.DataFrame(columns=["t", "v"])
+    df = df.rename(columns={'t': 'Date_Time', 'v': 'Water_Level'})
+    df['Date_Time'] = pd.to_datetime(df['Date_Time'])
+    # NOAA reports gaps as empty strings
+    df['Water_Level'] = pd.to_numeric(df['Water_Level'], errors="coerce")
+    return df.dropna(subset=['Water_Level']).reset_index(drop=True)
@@ -0,0 +1,116 @@
+import os
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from data import noaa_store
+from data.noaa import NOAA_TAIL_REFRESH_SECONDS, fetch_water_levels
+from data.singleflight import SingleFlight
+
+# --- Multi-resolution pyramid of sea level aggregates ---
+# Each station-year's raw 6-minute series is resampled once into hourly, daily
+# and monthly mean/min/max levels, stored next to the raw series. Charts pick
+# the coarsest level that still gives enough points for the requested span, so
+# a decade view reads ~120 monthly rows per year instead of ~87k raw ones.
+RESOLUTIONS = {"hourly": "1h", "daily": "1D", "monthly": "MS"}
+
+# Longest span (in days) each level is used for; above the last one, monthly
+RAW_MAX_DAYS = int(os.getenv("SEA_LEVEL_RAW_MAX_DAYS", "10"))
+HOURLY_MAX_DAYS = int(os.getenv("SEA_LEVEL_HOURLY_MAX_DAYS", "120"))
+DAILY_MAX_DAYS = int(os.getenv("SEA_LEVEL_DAILY_MAX_DAYS", str(3 * 366)))
+
+_flight = SingleFlight()
+
+
+def resample(df, resolution):
+    """Vectorized mean/min/max of Water_Level per hourly/daily/monthly bucket."""
+    levels = df.set_index("Date_Time")["Water_Level"]
+    agg = levels.resample(RESOLUTIONS[resolution]).agg(["mean", "min", "max"]).dropna()
+    agg = agg.rename(columns={"mean": "Water_Level", "min": "Min", "max": "Max"})
+    return agg.rename_axis("Date_Time").reset_index()
+
+
+def build_year(station_id, year, datum="MSL"):
+    """Returns {resolution: frame} for the station-year, building and storing it if needed."""
+    return _flight.do((station_id, int(year), datum), _build_year, station_id, int(year), datum)
+
+
+def _build_year(station_id, year, datum):
+    current_year = datetime.now(timezone.utc).year
+    stored = {res: noaa_store.load_aggregate(station_id, year, datum, res) for res in RESOLUTIONS}
+    if all(s is not None for s in stored.values()):
+        fresh = all(s.complete for s in stored.values()) or (
+            year >= current_year and time.time() - min(s.fetched_at for s in stored.values()) < NOAA_TAIL_REFRESH_SECONDS
+        )
+        if fresh:
+            return {res: s.df for res, s in stored.items()}
+
+    raw = fetch_water_levels(station_id, year, datum)
+    pyramid = {res: resample(raw, res) for res in RESOLUTIONS}
+    if not raw.attrs.get("failed_chunks"):
+        for res, df in pyramid.items():
+            noaa_store.save_aggregate(station_id, year, datum, res, df, complete=year < current_year)
+    return pyramid
+
+
+def pick_resolution(span):
+    """'raw', 'hourly', 'daily' or 'monthly' for a pandas Timedelta span."""
+    days = span / pd.Timedelta(days=1)
+    if days <= RAW_MAX_DAYS:
+        return "raw"
+    if days <= HOURLY_MAX_DAYS:
+        return "hourly"
+    if days <= DAILY_MAX_DAYS:
+        return "daily"
+    return "monthly"
+
+
+def load_range(station_id, start, end, datum="MSL"):
+    """
+    Returns (resolution, frame) covering [start, end] at the level chosen for its span.
+    Raw frames have Date_Time/Water_Level; aggregates also carry Min/Max.
+    Years (or raw month chunks) that fail to load are skipped and listed in
+    df.attrs["failed"]; if every year fails the first error is raised.
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    resolution = pick_resolution(end - start)
+    frames = []
+    failed = []
+    first_error = None
+    for year in range(start.year, end.year + 1):
+        try:
+            if resolution == "raw":
+                df = fetch_water_levels(station_id, year, datum)
+                failed.extend(df.attrs.get("failed_chunks", []))
+            else:
+                df = build_year(station_id, year, datum)[resolution]
+        except Exception as e:
+            failed.append(str(year))
+            first_error = first_error or e
+            continue
+        frames.append(df)
+    if not frames and first_error is not None:
+        raise first_error
+
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["Date_Time", "Water_Level"])
+    df = df[(df["Date_Time"] >= start) & (df["Date_Time"] <= end)].reset_index(drop=True)
+    df.attrs["failed"] = failed
+    return resolution, df
+
+
+def daily_rolling_mean(station_id, start, end, window_days=7, datum="MSL"):
+    """True N-day rolling mean, computed from the daily means rather than N raw samples."""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    frames = []
+    for year in range(start.year, end.year + 1):
+        try:
+            frames.append(build_year(station_id, year, datum)["daily"])
+        except Exception:
+            continue
+    if not frames:
+        return pd.Series(dtype="float64")
+    daily = pd.concat(frames, ignore_index=True)
+    rolling = daily.set_index("Date_Time")["Water_Level"].rolling(f"{window_days}D", min_periods=1).mean()
+    rolling = rolling[(rolling.index >= start) & (rolling.index <= end)]
+    return rolling
@@ -0,0 +1,186 @@
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# --- Persistent on-disk store for NOAA water level series ---
+# One NumPy .npz file per (station, year, datum) holding the timestamps and
+# levels as columns. Past years are stored once and never downloaded again;
+# the current year is stored as a partial series that fetch_water_levels()
+# extends with just the missing tail.
+STORE_DIR = os.getenv("NOAA_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "noaa"))
+STORE_MAX_BYTES = int(os.getenv("NOAA_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+_lock = threading.Lock()
+
+
+class StoredSeries:
+    """A series read back from disk: the frame, whether the year is complete, and when it was fetched."""
+
+    def __init__(self, df, complete, fetched_at):
+        self.df = df
+        self.complete = complete
+        self.fetched_at = fetched_at
+
+
+def _path(station_id, year, datum, suffix=""):
+    return os.path.join(STORE_DIR, f"{station_id}_{int(year)}_{datum}{suffix}.npz")
+
+
+def load(station_id, year, datum="MSL"):
+    """Returns the StoredSeries for the station-year, or None if it isn't on disk."""
+    path = _path(station_id, year, datum)
+    try:
+        with np.load(path) as npz:
+            df = pd.DataFrame({
+                "Date_Time": pd.to_datetime(npz["t"], unit="s"),
+                "Water_Level": npz["v"].astype("float64"),
+            })
+            complete = bool(npz["complete"])
+            fetched_at = float(npz["fetched_at"])
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError):
+        # A truncated or foreign file is treated as a miss and rewritten later
+        return None
+    # Touch the file so eviction drops the least recently read series first
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return StoredSeries(df, complete, fetched_at)
+
+
+def save(station_id, year, datum, df, complete):
+    """Writes the series atomically, then evicts old files if the store is over its size cap."""
+    os.makedirs(STORE_DIR, exist_ok=True)
+    path = _path(station_id, year, datum)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as fh:
+        np.savez(
+            fh,
+            t=df["Date_Time"].to_numpy(dtype="datetime64[s]").astype("int64"),
+            v=df["Water_Level"].to_numpy(dtype="float32"),
+            complete=np.bool_(complete),
+            fetched_at=np.float64(time.time()),
+        )
+    os.replace(tmp_path, path)
+    evict()
+
+
+# --- Pre-aggregated levels (hourly/daily/monthly mean, min, max) ---
+# Stored next to the raw series as <station>_<year>_<datum>_<resolution>.npz
+def load_aggregate(station_id, year, datum, resolution):
+    path = _path(station_id, year, datum, suffix=f"_{resolution}")
+    try:
+        with np.load(path) as npz:
+            df = pd.DataFrame({
+                "Date_Time": pd.to_datetime(npz["t"], unit="s"),
+                "Water_Level": npz["mean"].astype("float64"),
+                "Min": npz["min"].astype("float64"),
+                "Max": npz["max"].astype("float64"),
+            })
+            complete = bool(npz["complete"])
+            fetched_at = float(npz["fetched_at"])
+    except (OSError, ValueError, KeyError):
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return StoredSeries(df, complete, fetched_at)
+
+
+def save_aggregate(station_id, year, datum, resolution, df, complete):
+    """Writes one aggregate atomically, then evicts old files like save()."""
+    os.makedirs(STORE_DIR, exist_ok=True)
+    path = _path(station_id, year, datum, suffix=f"_{resolution}")
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as fh:
+        np.savez(
+            fh,
+            t=df["Date_Time"].to_numpy(dtype="datetime64[s]").astype("int64"),
+            mean=df["Water_Level"].to_numpy(dtype="float32"),
+            min=df["Min"].to_numpy(dtype="float32"),
+            max=df["Max"].to_numpy(dtype="float32"),
+            complete=np.bool_(complete),
+            fetched_at=np.float64(time.time()),
+        )
+    os.replace(tmp_path, path)
+    evict()
+
+
+def _npz_files():
+    try:
+        names = os.listdir(STORE_DIR)
+    except FileNotFoundError:
+        return []
+    files = []
+    for name in names:
+        if not name.endswith(".npz"):
+            continue
+        path = os.path.join(STORE_DIR, name)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        files.append((st.st_mtime, st.st_size, path))
+    return files
+
+
+def evict(max_bytes=None):
+    """Deletes the least recently used files until the store fits in max_bytes."""
+    max_bytes = STORE_MAX_BYTES if max_bytes is None else max_bytes
+    with _lock:
+        files = sorted(_npz_files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+
+def stats():
+    files = _npz_files()
+    return {
+        "dir": STORE_DIR,
+        "files": len(files),
+        "bytes": sum(size for _, size, _ in files),
+        "max_bytes": STORE_MAX_BYTES,
+    }
+
+
+# --- CLI: prefetch every station for a range of years ---
+# python -m data.noaa_store --start 2010 --end 2024
+def main(argv=None):
+    from data.noaa import STATIONS
+    from data.noaa_pyramid import build_year
+
+    parser = argparse.ArgumentParser(description="Prefetch NOAA water levels into the local store.")
+    parser.add_argument("--start", type=int, required=True, help="first year to fetch")
+    parser.add_argument("--end", type=int, required=True, help="last year to fetch (inclusive)")
+    parser.add_argument("--datum", default="MSL")
+    parser.add_argument("--station", action="append", help="station id (default: all STATIONS)")
+    args = parser.parse_args(argv)
+
+    stations = args.station or list(STATIONS)
+    for station_id in stations:
+        for year in range(args.start, args.end + 1):
+            try:
+                # Downloads the raw series (if not stored) and its hourly/daily/monthly aggregates
+                pyramid = build_year(station_id, year, args.datum)
+                print(f"{station_id} {year}: {len(pyramid['daily'])} days")
+            except Exception as e:
+                print(f"{station_id} {year}: failed ({e})")
+    print(stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import heapq
+import threading
+
+import numpy as np
+
+# --- Popularity of requested keys (cities) in bounded memory ---
+# A count-min sketch estimates how often each key was requested without
+# storing every key, and a small top-K table keeps the keys with the highest
+# estimates. Counts are halved every decay_every requests so the ranking
+# follows recent interest rather than all-time totals.
+
+
+class CountMinSketch:
+    """Approximate counts: never under-estimates, over-estimates by about total / width."""
+
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self._table = np.zeros((depth, width), dtype=np.int64)
+        self._rows = np.arange(depth)
+
+    def _columns(self, key):
+        return np.array([hash((row, key)) % self.width for row in range(self.depth)])
+
+    def add(self, key, count=1):
+        """Adds count to key and returns its new estimate."""
+        columns = self._columns(key)
+        self._table[self._rows, columns] += count
+        return int(self._table[self._rows, columns].min())
+
+    def estimate(self, key):
+        return int(self._table[self._rows, self._columns(key)].min())
+
+    def decay(self):
+        self._table >>= 1
+
+
+class TopK:
+    """Thread-safe tracker of the k most requested keys."""
+
+    def __init__(self, k=20, width=2048, depth=4, decay_every=10_000):
+        self.k = k
+        self.decay_every = decay_every
+        self._sketch = CountMinSketch(width, depth)
+        self._top = {}  # key -> estimated count
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.decays = 0
+
+    def touch(self, key):
+        """Counts one request for key."""
+        with self._lock:
+            estimate = self._sketch.add(key)
+            self.requests += 1
+            if key in self._top or len(self._top) < self.k:
+                self._top[key] = estimate
+            else:
+                coldest = min(self._top, key=self._top.get)
+                if estimate > self._top[coldest]:
+                    del self._top[coldest]
+                    self._top[key] = estimate
+            if self.requests % self.decay_every == 0:
+                self._sketch.decay()
+                self._top = {key: count >> 1 for key, count in self._top.items()}
+                self.decays += 1
+
+    def top(self, n=None):
+        """[(key, estimated count)], most requested first."""
+        with self._lock:
+            items = list(self._top.items())
+        return heapq.nlargest(n or self.k, items, key=lambda item: item[1])
+
+    def stats(self):
+        return {
+            "k": self.k,
+            "tracked": len(self._top),
+            "requests": self.requests,
+            "decays": self.decays,
+            "top": [{"key": str(key), "count": count} for key, count in self.top(10)],
+        }
@@ -0,0 +1,176 @@
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; the shared bucket falls back to per-process
+    fcntl = None
+
+# --- Token-bucket rate limiting for a shared API key ---
+# Tokens refill at rate_per_minute up to a burst capacity; every upstream call
+# takes one. Callers queue by priority class: interactive lookups are always
+# served before background prefetch, and background calls also leave a
+# reserve of tokens untouched so a user click never waits behind a refresh.
+# Each caller has a deadline and gives up (acquire returns False) if no token
+# is available by then. With a state file, the bucket is kept in that file
+# under an flock, so every worker process on the host shares one quota.
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# Recent waits kept per priority for the percentiles in stats()
+_WAIT_SAMPLES = 512
+
+
+class TokenBucket:
+    """Thread-safe token bucket with priority queueing and per-call deadlines."""
+
+    def __init__(self, rate_per_minute, burst=None, background_reserve=0, deadlines=None, state_file=None):
+        self.rate = rate_per_minute / 60.0
+        self.burst = float(burst if burst is not None else max(1, rate_per_minute // 6))
+        self.background_reserve = min(float(background_reserve), self.burst - 1)
+        self.deadlines = {INTERACTIVE: 5.0, BACKGROUND: 60.0, **(deadlines or {})}
+        self.state_file = state_file if fcntl is not None else None
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters = []  # heap of [priority, seq]
+        self._seq = itertools.count()
+        self._stats = {
+            p: {"granted": 0, "timed_out": 0, "wait_total_s": 0.0, "wait_max_s": 0.0, "waits": deque(maxlen=_WAIT_SAMPLES)}
+            for p in PRIORITY_NAMES
+        }
+
+    # --- token accounting ---
+    def _refill(self, tokens, updated, now):
+        return min(self.burst, tokens + (now - updated) * self.rate)
+
+    def _try_take(self, priority, tokens):
+        """(tokens left, seconds until one is available for this priority; 0 if taken)."""
+        floor = 1.0 + (self.background_reserve if priority == BACKGROUND else 0.0)
+        if tokens >= floor:
+            return tokens - 1.0, 0.0
+        return tokens, (floor - tokens) / self.rate
+
+    def _take(self, priority):
+        if self.state_file:
+            return self._take_shared(priority)
+        now = time.monotonic()
+        self._tokens, wait = self._try_take(priority, self._refill(self._tokens, self._updated, now))
+        self._updated = now
+        return wait
+
+    def _take_shared(self, priority):
+        # wall-clock time, since monotonic clocks are not comparable across processes
+        with open(self.state_file, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or "{}")
+                except ValueError:
+                    state = {}
+                now = time.time()
+                tokens = self._refill(state.get("tokens", self.burst), state.get("updated", now), now)
+                tokens, wait = self._try_take(priority, tokens)
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps({"tokens": tokens, "updated": now}))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return wait
+
+    # --- queueing ---
+    def acquire(self, priority=INTERACTIVE, timeout=None):
+        """
+        Waits for a token, behind every earlier caller of the same or a higher
+        priority. Returns False if none was available within timeout seconds
+        (the priority's deadline when None).
+        """
+        started = time.monotonic()
+        deadline = started + (self.deadlines[priority] if timeout is None else timeout)
+        entry = [priority, next(self._seq)]
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    wait = None
+                    if self._waiters[0] is entry:
+                        wait = self._take(priority)
+                        if wait == 0:
+                            self._record(priority, time.monotonic() - started, granted=True)
+                            return True
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._record(priority, time.monotonic() - started, granted=False)
+                        return False
+                    self._cond.wait(remaining if wait is None else min(wait, remaining))
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def _record(self, priority, waited, granted):
+        s = self._stats[priority]
+        if granted:
+            s["granted"] += 1
+        else:
+            s["timed_out"] += 1
+        s["wait_total_s"] += waited
+        s["wait_max_s"] = max(s["wait_max_s"], waited)
+        s["waits"].append(waited)
+
+    def stats(self):
+        with self._cond:
+            queued = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _ in self._waiters:
+                queued[PRIORITY_NAMES[priority]] += 1
+            result = {
+                "rate_per_minute": round(self.rate * 60, 2),
+                "burst": self.burst,
+                "background_reserve": self.background_reserve,
+                "shared": bool(self.state_file),
+                "tokens": None if self.state_file else round(self._refill(self._tokens, self._updated, time.monotonic()), 2),
+                "queued": queued,
+            }
+            for priority, name in PRIORITY_NAMES.items():
+                s = self._stats[priority]
+                waits = sorted(s["waits"])
+                calls = s["granted"] + s["timed_out"]
+                result[name] = {
+                    "granted": s["granted"],
+                    "timed_out": s["timed_out"],
+                    "deadline_s": self.deadlines[priority],
+                    "wait_mean_s": round(s["wait_total_s"] / calls, 3) if calls else 0.0,
+                    "wait_p95_s": round(waits[int(0.95 * (len(waits) - 1))], 3) if waits else 0.0,
+                    "wait_max_s": round(s["wait_max_s"], 3),
+                }
+            return result
+
+
+def from_env(prefix, rate_per_minute, burst=None, background_reserve=0):
+    """
+    TokenBucket configured from <prefix>_CALLS_PER_MINUTE, _BURST,
+    _BACKGROUND_RESERVE, _INTERACTIVE_DEADLINE, _BACKGROUND_DEADLINE and
+    _RATE_STATE_FILE (set it to share the quota across processes).
+    """
+    def env(name, default):
+        value = os.getenv(f"{prefix}_{name}")
+        return float(value) if value not in (None, "") else default
+
+    return TokenBucket(
+        rate_per_minute=env("CALLS_PER_MINUTE", rate_per_minute),
+        burst=env("BURST", burst),
+        background_reserve=env("BACKGROUND_RESERVE", background_reserve),
+        deadlines={
+            INTERACTIVE: env("INTERACTIVE_DEADLINE", 5.0),
+            BACKGROUND: env("BACKGROUND_DEADLINE", 60.0),
+        },
+        state_file=os.getenv(f"{prefix}_RATE_STATE_FILE") or None,
+    )
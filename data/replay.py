@@ -0,0 +1,194 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from data import metrics
+
+# --- Record / replay of upstream API responses (OpenWeather, NOAA, GNews) ---
+# UPSTREAM_MODE selects how data/upstream.py reaches the APIs:
+#   live    - straight to the provider (default)
+#   record  - to the provider, and every response is saved as a fixture
+#   replay  - to a local stub server that serves the saved fixtures with
+#             injected latency and errors, so the whole app can be load tested
+#             offline and reproducibly without spending API quota (the fetch
+#             functions still need their API key variables set, to any value)
+# Fixtures go under data/cache/ (git-ignored), so recorded live responses are
+# never committed by accident; point UPSTREAM_FIXTURE_DIR elsewhere to keep a
+# set on purpose. The stub starts in-process on first use. To share one stub
+# between several app processes, run it standalone and point
+# UPSTREAM_REPLAY_URL at it:
+#   python -m data.replay --port 8765
+MODE = os.getenv("UPSTREAM_MODE", "live").lower()
+FIXTURE_DIR = os.getenv("UPSTREAM_FIXTURE_DIR", os.path.join(os.path.dirname(__file__), "cache", "upstream_fixtures"))
+# Set to reuse an already running stub (e.g. http://127.0.0.1:8765); empty starts one in-process
+REPLAY_URL = os.getenv("UPSTREAM_REPLAY_URL", "")
+# Injected per-request latency: base plus uniform jitter, in milliseconds
+REPLAY_LATENCY_MS = float(os.getenv("REPLAY_LATENCY_MS", "0"))
+REPLAY_JITTER_MS = float(os.getenv("REPLAY_JITTER_MS", "0"))
+# Fraction of requests answered with REPLAY_ERROR_STATUS instead of the fixture
+REPLAY_ERROR_RATE = float(os.getenv("REPLAY_ERROR_RATE", "0"))
+REPLAY_ERROR_STATUS = int(os.getenv("REPLAY_ERROR_STATUS", "503"))
+REPLAY_SEED = os.getenv("REPLAY_SEED")
+
+# Query parameters that carry credentials; never written to fixtures or used in keys
+SECRET_PARAMS = frozenset({"appid", "apikey", "api_key", "token", "key"})
+
+_lock = threading.Lock()
+_server = None
+_base_url = None
+_rng = random.Random(REPLAY_SEED)
+_stats = {"recorded": 0, "served": 0, "loose_matches": 0, "missing": 0, "injected_errors": 0}
+
+
+# --- Fixture store ---
+# One JSON file per (host, path, non-secret params). A replayed request with
+# no exact fixture falls back to the newest one for the same host and path,
+# so date-windowed requests (NOAA) still replay on later days.
+def _clean(params):
+    return sorted((str(k), str(v)) for k, v in (params or {}).items() if str(k).lower() not in SECRET_PARAMS)
+
+
+def _path_key(host, path):
+    return hashlib.sha1(f"{host}{path}".encode()).hexdigest()[:12]
+
+
+def fixture_name(host, path, params):
+    query = "&".join(f"{k}={v}" for k, v in _clean(params))
+    return f"{_path_key(host, path)}-{hashlib.sha1(query.encode()).hexdigest()[:16]}.json"
+
+
+def record(url, params, response):
+    """Saves a live response as a fixture (atomically, credentials stripped)."""
+    parts = urlsplit(url)
+    fixture = {
+        "url": f"{parts.scheme}://{parts.netloc}{parts.path}",
+        "params": dict(_clean(params)),
+        "status": response.status_code,
+        "content_type": response.headers.get("Content-Type", "application/json"),
+        "body": response.text,
+        "elapsed_ms": round(response.elapsed.total_seconds() * 1000, 1),
+        "recorded_at": time.time(),
+    }
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = os.path.join(FIXTURE_DIR, fixture_name(parts.hostname or "", parts.path, params))
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(fixture, f)
+    os.replace(tmp, path)
+    with _lock:
+        _stats["recorded"] += 1
+
+
+def _load(host, path, params):
+    exact = os.path.join(FIXTURE_DIR, fixture_name(host, path, params))
+    if os.path.exists(exact):
+        with open(exact, encoding="utf-8") as f:
+            return json.load(f), False
+    prefix = _path_key(host, path) + "-"
+    try:
+        candidates = [n for n in os.listdir(FIXTURE_DIR) if n.startswith(prefix) and n.endswith(".json")]
+    except FileNotFoundError:
+        return None, False
+    if not candidates:
+        return None, False
+    newest = max(candidates, key=lambda n: os.path.getmtime(os.path.join(FIXTURE_DIR, n)))
+    with open(os.path.join(FIXTURE_DIR, newest), encoding="utf-8") as f:
+        return json.load(f), True
+
+
+# --- Stub upstream server ---
+# Requests arrive as /<original host>/<original path>?<original query>.
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        host, _, path = parts.path.lstrip("/").partition("/")
+        params = dict(parse_qsl(parts.query, keep_blank_values=True))
+
+        delay = REPLAY_LATENCY_MS + (_rng.uniform(0, REPLAY_JITTER_MS) if REPLAY_JITTER_MS else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+        if REPLAY_ERROR_RATE and _rng.random() < REPLAY_ERROR_RATE:
+            with _lock:
+                _stats["injected_errors"] += 1
+            return self._send(REPLAY_ERROR_STATUS, "application/json", json.dumps({"message": "Injected error"}))
+
+        fixture, loose = _load(host, "/" + path, params)
+        with _lock:
+            if fixture is None:
+                _stats["missing"] += 1
+            else:
+                _stats["served"] += 1
+                _stats["loose_matches"] += loose
+        if fixture is None:
+            body = json.dumps({"cod": "404", "message": f"No recorded response for {host}/{path}"})
+            return self._send(404, "application/json", body)
+        self._send(fixture["status"], fixture["content_type"], fixture["body"])
+
+    def _send(self, status, content_type, body):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host="127.0.0.1", port=0):
+    """Starts the stub on a daemon thread. Returns (server, base URL)."""
+    server = ThreadingHTTPServer((host, port), _StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="upstream-replay", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def target(url):
+    """The stub URL a replayed request for url is sent to (starting the stub if needed)."""
+    global _server, _base_url
+    if _base_url is None:
+        with _lock:
+            if _base_url is None:
+                if REPLAY_URL:
+                    _base_url = REPLAY_URL.rstrip("/")
+                else:
+                    _server, _base_url = serve()
+    parts = urlsplit(url)
+    return f"{_base_url}/{parts.hostname}{parts.path}"
+
+
+def stats():
+    return dict(
+        _stats,
+        mode=MODE,
+        fixture_dir=FIXTURE_DIR,
+        stub=_base_url,
+        latency_ms=REPLAY_LATENCY_MS,
+        jitter_ms=REPLAY_JITTER_MS,
+        error_rate=REPLAY_ERROR_RATE,
+    )
+
+
+metrics.register("upstream_replay", stats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded upstream responses.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    _, url = serve(args.host, args.port)
+    print(f"Replaying {FIXTURE_DIR} on {url} (set UPSTREAM_REPLAY_URL={url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,80 @@
+import threading
+
+
+# --- Request coalescing ---
+# Concurrent callers asking for the same key wait on one in-flight call and
+# share its result, so a burst of identical lookups costs one upstream hit.
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def outcome(self):
+        """The shared result (re-raising the shared error); only valid once done is set."""
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; duplicates wait for its result."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def _join(self, key):
+        """(call, is_leader) for key, registering a new call if none is in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                return call, False
+            call = self._calls[key] = _Call()
+            self.executed += 1
+            return call, True
+
+    def _run(self, key, call, fn, args, kwargs):
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def do(self, key, fn, *args, **kwargs):
+        call, leader = self._join(key)
+        if not leader:
+            call.done.wait()
+            return call.outcome()
+        return self._run(key, call, fn, args, kwargs)
+
+    def start(self, key, submit, fn, *args, **kwargs):
+        """
+        Non-blocking variant of do: the leader's call is handed to submit
+        (e.g. an executor's submit) and every caller gets the shared call back,
+        to wait on with call.done.wait(timeout) and read with call.outcome().
+        If submit raises, the call fails with that error for everyone.
+        """
+        call, leader = self._join(key)
+        if leader:
+            try:
+                submit(self._run, key, call, fn, args, kwargs)
+            except BaseException as e:
+                call.error = e
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+                raise
+        return call
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": len(self._calls), "executed": self.executed, "coalesced": self.coalesced}
@@ -0,0 +1,147 @@
+import heapq
+
+import numpy as np
+
+# --- Nearest-neighbour lookups over lat/lon points ---
+# Points are stored as 3-D unit vectors, where straight-line (chord) distance
+# orders points exactly like great-circle distance, so a plain k-d tree gives
+# exact nearest neighbours anywhere on the globe. Small point sets (the state
+# maps have a few dozen) are searched by brute force over the whole distance
+# matrix, fully vectorized; larger ones use scipy's cKDTree when it is
+# installed and the small pure-NumPy KDTree below otherwise.
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # optional dependency
+    cKDTree = None
+
+EARTH_RADIUS_KM = 6371.0
+# Up to this many points a brute-force search beats walking a tree
+BRUTE_FORCE_MAX_POINTS = 512
+# Distance matrix entries computed at once by the brute-force search (bounds memory)
+BRUTE_FORCE_CHUNK = 1 << 22
+
+
+def to_xyz(lat, lon):
+    lat = np.radians(np.asarray(lat, dtype="float64"))
+    lon = np.radians(np.asarray(lon, dtype="float64"))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def chord_to_km(chord):
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2.0, 0.0, 1.0))
+
+
+class KDTree:
+    """Static k-d tree with exact k-nearest queries, O(log N) per query on average."""
+
+    def __init__(self, points, leaf_size=8):
+        self.points = np.asarray(points, dtype="float64")
+        self.leaf_size = leaf_size
+        self._order = np.arange(len(self.points))
+        # node -> (start, stop, axis, split, left, right); axis == -1 marks a leaf
+        self._nodes = []
+        self._root = self._build(0, len(self.points)) if len(self.points) else None
+
+    def _build(self, start, stop):
+        node = len(self._nodes)
+        self._nodes.append(None)
+        if stop - start <= self.leaf_size:
+            self._nodes[node] = (start, stop, -1, 0.0, -1, -1)
+            return node
+        idx = self._order[start:stop]
+        pts = self.points[idx]
+        axis = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+        mid = (stop - start) // 2
+        part = np.argpartition(pts[:, axis], mid)
+        self._order[start:stop] = idx[part]
+        split = float(self.points[self._order[start + mid], axis])
+        left = self._build(start, start + mid)
+        right = self._build(start + mid, stop)
+        self._nodes[node] = (start, stop, axis, split, left, right)
+        return node
+
+    def query(self, points, k=1):
+        """(distances, indices), each shaped (len(points), k); missing neighbours are inf / -1."""
+        points = np.atleast_2d(np.asarray(points, dtype="float64"))
+        dist = np.full((len(points), k), np.inf)
+        index = np.full((len(points), k), -1, dtype="int64")
+        for row, q in enumerate(points):
+            best = self._query_one(q, k)
+            for j, (neg_d2, i) in enumerate(sorted(best, reverse=True)):
+                dist[row, j] = np.sqrt(-neg_d2)
+                index[row, j] = i
+        return dist, index
+
+    def _query_one(self, q, k):
+        best = []  # max-heap of (-squared distance, index)
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            start, stop, axis, split, left, right = self._nodes[stack.pop()]
+            if axis == -1:
+                idx = self._order[start:stop]
+                d2 = ((self.points[idx] - q) ** 2).sum(axis=1)
+                for d, i in zip(d2, idx):
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, int(i)))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, int(i)))
+                continue
+            diff = q[axis] - split
+            near, far = (left, right) if diff < 0 else (right, left)
+            # far side only if the splitting plane is closer than the current k-th neighbour
+            if len(best) < k or diff * diff < -best[0][0]:
+                stack.append(far)
+            stack.append(near)
+        return best
+
+
+class BruteForce:
+    """Exact k-nearest by computing every query-to-point distance; same query() as KDTree."""
+
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype="float64")
+
+    def query(self, points, k=1):
+        points = np.atleast_2d(np.asarray(points, dtype="float64"))
+        dist = np.empty((len(points), k))
+        index = np.empty((len(points), k), dtype="int64")
+        rows = max(1, BRUTE_FORCE_CHUNK // max(1, len(self.points)))
+        for start in range(0, len(points), rows):
+            q = points[start:start + rows]
+            d2 = ((q[:, None, :] - self.points[None, :, :]) ** 2).sum(axis=2)
+            # k smallest per row in any order, then sorted
+            if k < len(self.points):
+                near = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            else:
+                near = np.broadcast_to(np.arange(k), (len(q), k))
+            near_d2 = np.take_along_axis(d2, near, axis=1)
+            order = np.argsort(near_d2, axis=1)
+            index[start:start + rows] = np.take_along_axis(near, order, axis=1)
+            dist[start:start + rows] = np.sqrt(np.take_along_axis(near_d2, order, axis=1))
+        return dist, index
+
+
+class SpatialIndex:
+    """Nearest-neighbour index over lat/lon points; distances are great-circle km."""
+
+    def __init__(self, lat, lon):
+        xyz = to_xyz(lat, lon)
+        self.size = len(xyz)
+        if self.size <= BRUTE_FORCE_MAX_POINTS:
+            self._tree = BruteForce(xyz)
+        else:
+            self._tree = cKDTree(xyz) if cKDTree is not None else KDTree(xyz)
+
+    def query(self, lat, lon, k=1):
+        """(distances_km, indices) of the k nearest points to each query point, shaped (n, k)."""
+        k = min(k, self.size)
+        dist, index = self._tree.query(np.atleast_2d(to_xyz(lat, lon)), k=k)
+        dist = np.asarray(dist).reshape(-1, k)
+        index = np.asarray(index).reshape(-1, k)
+        return chord_to_km(dist), index
+
+    def nearest(self, lat, lon):
+        """(index, distance_km) of the single nearest point."""
+        dist, index = self.query(lat, lon, k=1)
+        return int(index[0, 0]), float(dist[0, 0])
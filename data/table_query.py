@@ -0,0 +1,147 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# --- Server-side evaluation of DataTable filter_query / sort_by ---
+# Used by the Data Table page in custom paging mode (and by the CSV export) so
+# the browser only ever receives one page of rows.
+_EXPRESSION = re.compile(
+    r"^\{(?P<column>[^}]+)\}\s*"
+    r"(?P<op>[is]?(?:contains|datestartswith|eq|ne|lt|le|gt|ge|<=|>=|!=|=|<|>))\s*"
+    r"(?P<value>.*)$"
+)
+_SYMBOLS = {"=": "eq", "!=": "ne", "<": "lt", "<=": "le", ">": "gt", ">=": "ge"}
+
+
+def parse_filter_query(filter_query):
+    """
+    Splits a DataTable filter_query ("{CO2} > 5 && {Country} icontains ind") into
+    (column, operator, value, case_sensitive) tuples.
+    Raises ValueError for expressions it doesn't understand.
+    """
+    if not filter_query:
+        return []
+    clauses = []
+    for part in filter_query.split(" && "):
+        match = _EXPRESSION.match(part.strip())
+        if not match:
+            raise ValueError(f"Unsupported filter: {part.strip()}")
+        op = match.group("op")
+        case_sensitive = not op.startswith("i")
+        if op[0] in "is":  # case prefix; no bare operator starts with i or s
+            op = op[1:]
+        op = _SYMBOLS.get(op, op)
+        clauses.append((match.group("column"), op, _parse_value(match.group("value").strip()), case_sensitive))
+    return clauses
+
+
+def _parse_value(value_part):
+    if len(value_part) >= 2 and value_part[0] == value_part[-1] and value_part[0] in ("'", '"', "`"):
+        quote = value_part[0]
+        return value_part[1:-1].replace("\\" + quote, quote)
+    try:
+        return float(value_part)
+    except ValueError:
+        return value_part
+
+
+def filter_mask(df, clauses):
+    """Vectorized boolean mask of the rows matching every clause."""
+    mask = pd.Series(True, index=df.index)
+    for column, op, value, case_sensitive in clauses:
+        if column not in df.columns:
+            raise ValueError(f"Unknown column: {column}")
+        col = df[column]
+        if op in ("contains", "datestartswith"):
+            text = col.astype(str)
+            needle = str(value)
+            if op == "contains":
+                mask &= text.str.contains(needle, case=case_sensitive, regex=False)
+            else:
+                mask &= text.str.startswith(needle)
+            continue
+        if not pd.api.types.is_numeric_dtype(col):
+            col = col.astype(str)
+            value = str(value)
+            if not case_sensitive:
+                col = col.str.lower()
+                value = value.lower()
+        elif isinstance(value, str):
+            raise ValueError(f"{column} needs a number, got {value!r}")
+        if op == "eq":
+            mask &= col == value
+        elif op == "ne":
+            mask &= col != value
+        elif op == "lt":
+            mask &= col < value
+        elif op == "le":
+            mask &= col <= value
+        elif op == "gt":
+            mask &= col > value
+        elif op == "ge":
+            mask &= col >= value
+    return mask
+
+
+def apply_filter_and_sort(df, filter_query=None, sort_by=None):
+    clauses = parse_filter_query(filter_query)
+    if clauses:
+        df = df[filter_mask(df, clauses)]
+    if sort_by:
+        df = df.sort_values(
+            [s["column_id"] for s in sort_by],
+            ascending=[s["direction"] == "asc" for s in sort_by],
+            kind="stable",
+        )
+    return df
+
+
+def page_of(df, page_current, page_size):
+    """Rows of the requested page and the total page count."""
+    page_current = page_current or 0
+    page_count = max(1, -(-len(df) // page_size))
+    start = page_current * page_size
+    return df.iloc[start:start + page_size], page_count
+
+
+def iter_filtered_chunks(df, filter_query=None, sort_by=None, chunk_rows=50_000):
+    """
+    Yields the filtered (and sorted) rows in chunks without materializing the result.
+    Sorting only builds an int64 row order; each chunk is gathered and filtered on its own.
+    Raises ValueError up front for a bad filter, before anything is yielded.
+    """
+    clauses = parse_filter_query(filter_query)
+    for column in [s["column_id"] for s in sort_by or []] + [c[0] for c in clauses]:
+        if column not in df.columns:
+            raise ValueError(f"Unknown column: {column}")
+    # type checks (a number compared with text) on an empty slice of the same dtypes
+    filter_mask(df.iloc[:0], clauses)
+    order = _sort_order(df, sort_by) if sort_by else None
+    return _chunks(df, clauses, order, chunk_rows)
+
+
+def _chunks(df, clauses, order, chunk_rows):
+    for start in range(0, len(df), chunk_rows):
+        if order is None:
+            chunk = df.iloc[start:start + chunk_rows]
+        else:
+            chunk = df.take(order[start:start + chunk_rows])
+        if clauses:
+            chunk = chunk[filter_mask(chunk, clauses)]
+        if len(chunk):
+            yield chunk
+
+
+def _sort_order(df, sort_by):
+    # np.lexsort sorts by its last key first, so keys are passed in reverse
+    keys = []
+    for s in reversed(sort_by):
+        col = df[s["column_id"]]
+        values = np.asarray(col.cat.codes) if isinstance(col.dtype, pd.CategoricalDtype) else col.to_numpy()
+        if not np.issubdtype(values.dtype, np.number):
+            # strings: rank them so descending order can be expressed by negation
+            values = pd.factorize(values, sort=True)[0]
+        values = values.astype("float64")
+        keys.append(values if s["direction"] == "asc" else -values)
+    return np.lexsort(keys)
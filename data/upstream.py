@@ -0,0 +1,122 @@
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from data import circuit_breaker, metrics, replay
+
+# --- Shared HTTP client for all upstream APIs (OpenWeather, NOAA, GNews) ---
+# One pooled requests.Session per host, so keep-alive sockets are reused
+# across callbacks and no call can hang a worker thread without a timeout.
+CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", "10"))
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("UPSTREAM_BACKOFF_FACTOR", "0.5"))
+BACKOFF_JITTER = float(os.getenv("UPSTREAM_BACKOFF_JITTER", "0.3"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+DEFAULT_POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", "10"))
+# Hosts that see more concurrent traffic get a larger connection pool
+HOST_POOL_SIZES = {
+    "api.openweathermap.org": 16,
+    "api.tidesandcurrents.noaa.gov": 12,
+    "gnews.io": 4,
+}
+
+USER_AGENT = "ClimaView/1.0"
+
+
+class _JitterRetry(Retry):
+    """Exponential backoff with random jitter so retries from many threads don't line up."""
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return backoff
+        return backoff + random.uniform(0, BACKOFF_JITTER)
+
+
+_sessions = {}
+_lock = threading.Lock()
+_stats = {}
+
+
+def _build_session(host):
+    pool_size = HOST_POOL_SIZES.get(host, DEFAULT_POOL_SIZE)
+    retry = _JitterRetry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,  # the final response is returned and raise_for_status() decides
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry, pool_block=False)
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def session_for(url):
+    """Returns the pooled session for the host of the given URL."""
+    host = urlsplit(url).hostname or ""
+    session = _sessions.get(host)
+    if session is None:
+        with _lock:
+            session = _sessions.get(host)
+            if session is None:
+                session = _sessions[host] = _build_session(host)
+                _stats[host] = {"requests": 0, "errors": 0}
+    return session
+
+
+def get(url, params=None, timeout=None, **kwargs):
+    """
+    GET through the pooled session for the URL's host, with default timeouts
+    and retries. Recorded or served from fixtures per UPSTREAM_MODE (data/replay.py).
+    Raises circuit_breaker.CircuitOpenError while the provider's circuit is open.
+    """
+    session = session_for(url)
+    host = urlsplit(url).hostname or ""
+    stats = _stats[host]
+    breaker = circuit_breaker.breaker_for_url(url)
+    if breaker is not None:
+        breaker.before_call()
+    stats["requests"] += 1
+    started = time.monotonic()
+    ok = False
+    try:
+        if replay.MODE == "replay":
+            response = session.get(replay.target(url), params=params, timeout=timeout or DEFAULT_TIMEOUT, **kwargs)
+        else:
+            response = session.get(url, params=params, timeout=timeout or DEFAULT_TIMEOUT, **kwargs)
+            if replay.MODE == "record":
+                replay.record(url, params, response)
+        # 4xx other than 429 is the caller's fault (unknown city), not the provider's
+        ok = response.status_code < 500 and response.status_code != 429
+        return response
+    except requests.exceptions.RequestException:
+        stats["errors"] += 1
+        raise
+    finally:
+        if breaker is not None:
+            breaker.record(ok, time.monotonic() - started)
+
+
+def _upstream_stats():
+    return {
+        "timeout": {"connect": CONNECT_TIMEOUT, "read": READ_TIMEOUT},
+        "hosts": {host: dict(s) for host, s in _stats.items()},
+    }
+
+
+metrics.register("upstream", _upstream_stats)
@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+
+# --- Vectorized wind vector field ---
+# Turns arrays of lat/lon/speed/bearing into arrow polylines (shaft plus a
+# two-stroke arrowhead) in one NumPy pass and packs every arrow into a single
+# Scattermapbox trace, NaN-separated. Dense fields (gridded reanalysis data,
+# 10k-100k vectors) are clipped to the visible map area and thinned to one
+# arrow per screen cell for the current zoom so the map stays legible and the
+# payload small.
+KM_PER_DEG_LAT = 111.0
+SCALE_KM_PER_MS = 4.0  # arrow length on the map per m/s of wind
+HEAD_FRACTION = 0.35  # arrowhead stroke length relative to the shaft
+HEAD_ANGLE_DEG = 25.0
+# Thinning keeps one arrow per cell of this many screen pixels...
+THIN_CELL_PX = int(os.getenv("WIND_THIN_CELL_PX", "28"))
+# ...and only kicks in for fields larger than this
+THIN_MIN_VECTORS = int(os.getenv("WIND_THIN_MIN_VECTORS", "500"))
+
+# Points per arrow: start, end, gap, left head, end, right head, gap
+_POINTS_PER_ARROW = 7
+
+
+def _offset(lat, lon, dist_km, bearing_rad):
+    """Moves points dist_km along a compass bearing (flat-earth approximation, fine for short arrows)."""
+    dlat = dist_km * np.cos(bearing_rad) / KM_PER_DEG_LAT
+    dlon = dist_km * np.sin(bearing_rad) / (KM_PER_DEG_LAT * np.maximum(np.cos(np.radians(lat)), 1e-6))
+    return lat + dlat, lon + dlon
+
+
+def arrow_paths(lat, lon, speed, bearing, scale_km_per_ms=SCALE_KM_PER_MS,
+                head_fraction=HEAD_FRACTION, head_angle_deg=HEAD_ANGLE_DEG):
+    """
+    (lats, lons) for drawing every arrow in one line trace, NaN between arrows.
+    bearing is the compass direction the arrow points (0 = north, 90 = east).
+    """
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    length = np.asarray(speed, dtype="float64") * scale_km_per_ms
+    theta = np.radians(np.asarray(bearing, dtype="float64"))
+
+    end_lat, end_lon = _offset(lat, lon, length, theta)
+    # arrowhead strokes point back from the tip, either side of the shaft
+    back = theta + np.pi
+    spread = np.radians(head_angle_deg)
+    head = length * head_fraction
+    left_lat, left_lon = _offset(end_lat, end_lon, head, back - spread)
+    right_lat, right_lon = _offset(end_lat, end_lon, head, back + spread)
+
+    gap = np.full_like(lat, np.nan)
+    lats = np.column_stack([lat, end_lat, gap, left_lat, end_lat, right_lat, gap]).ravel()
+    lons = np.column_stack([lon, end_lon, gap, left_lon, end_lon, right_lon, gap]).ravel()
+    return lats, lons
+
+
+def thin_indices(lat, lon, zoom, speed=None, bounds=None, cell_px=THIN_CELL_PX, min_vectors=THIN_MIN_VECTORS):
+    """
+    Indices of the vectors to draw at a map zoom level: one per cell of about
+    cell_px screen pixels (the strongest, if speed is given), only inside
+    bounds (west, south, east, north) when given. Fields of at most
+    min_vectors are returned whole.
+    """
+    n = len(lat)
+    if n <= min_vectors or zoom is None:
+        return np.arange(n)
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    # web-mercator tiles are 256 px wide: 256 * 2**zoom px per 360 degrees
+    cell_deg = cell_px * 360.0 / (256.0 * 2.0 ** zoom)
+    candidates = np.arange(n)
+    if bounds is not None:
+        west, south, east, north = bounds
+        # a cell of margin, so arrows starting just off screen still show their tips
+        candidates = np.flatnonzero(
+            (lat >= south - cell_deg) & (lat <= north + cell_deg) & (lon >= west - cell_deg) & (lon <= east + cell_deg)
+        )
+    if speed is not None:
+        candidates = candidates[np.argsort(-np.asarray(speed, dtype="float64")[candidates], kind="stable")]
+    row = np.floor(lat[candidates] / cell_deg).astype("int64")
+    col = np.floor(lon[candidates] / cell_deg).astype("int64")
+    _, first = np.unique(row * (1 << 32) + col, return_index=True)
+    return np.sort(candidates[first])
+
+
+def wind_vector_trace(lat, lon, speed, bearing, zoom=None, name="Wind vectors", **line):
+    """One Scattermapbox line trace with every (thinned) arrow."""
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    speed = np.asarray(speed, dtype="float64")
+    bearing = np.asarray(bearing, dtype="float64")
+    keep = thin_indices(lat, lon, zoom, speed)
+    lats, lons = arrow_paths(lat[keep], lon[keep], speed[keep], bearing[keep])
+    return go.Scattermapbox(
+        lat=lats,
+        lon=lons,
+        mode="lines",
+        line=line or dict(width=2, color="royalblue"),
+        hoverinfo="none",
+        name=name,
+    )
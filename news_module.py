@@ -2,6 +2,8 @@ import requests
 import os
 from dotenv import load_dotenv 
 
+from data import upstream
+
 load_dotenv()
 
 GNEWS_API_KEY = os.getenv("GNEWS_API_KEY") 
@@ -22,7 +24,7 @@ def get_weather_news():
     }
 
     try:
-        response = requests.get(url, params=params, timeout=10) 
+        response = upstream.get(url, params=params) 
         response.raise_for_status() 
         data = response.json()
         
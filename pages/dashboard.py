@@ -1,31 +1,26 @@
-from dash import html, dcc, Input, Output, State, ctx, no_update, dash_table, callback
-import pandas as pd
+from dash import html, dcc, Input, Output, State, ctx, no_update, dash_table, callback, clientside_callback, ClientsideFunction
 import plotly.express as px
 import datetime
 import os
 from dotenv import load_dotenv
 from data.fetch_data import get_real_time_temperature 
+from data import export_jobs
+from data.climate_repository import year_bounds
+from data.city_warmer import DEFAULT_CITY  # kept warm in the weather cache
 import dash_bootstrap_components as dbc
-import random
 import dash
 
 dash.register_page(__name__, path="/dashboard")
 
-# Load climate data
-try:
-    # NOTE: Ensure 'data/climate.csv' exists in your project structure
-    df = pd.read_csv("data/climate.csv")
-    df["Year"] = df["Year"].astype(int)
-    ranked_df = df.copy()
-    ranked_df["Rank"] = ranked_df.groupby("Year")["Temperature"].rank(ascending=False)
-    min_year = df["Year"].min()
-    max_year = df["Year"].max()
-except FileNotFoundError:
-    print("Warning: climate.csv not found. Using dummy data for min/max year.")
-    min_year = 2000
-    max_year = 2024
-    df = pd.DataFrame()
-    ranked_df = pd.DataFrame()
+# Climate data bounds (the dataset itself is shared via data/climate_repository.py),
+# read per page load so a reloaded dataset's years reach the slider
+def _year_bounds():
+    try:
+        # NOTE: Ensure 'data/climate.csv' exists in your project structure
+        return year_bounds()
+    except FileNotFoundError:
+        print("Warning: climate.csv not found. Using dummy data for min/max year.")
+        return 2000, 2024
 
 
 # AI Tips
@@ -37,6 +32,8 @@ ai_tips = [
     "🔌 Turn off electronics when not in use.",
     "🌍 Support clean energy sources."
 ]
+# Seconds between tip changes (rotated in the browser)
+TIP_ROTATE_SECONDS = int(os.getenv("TIP_ROTATE_SECONDS", "15"))
 
 # English language support
 languages = {
@@ -51,8 +48,6 @@ languages = {
     }
 }
 
-DEFAULT_CITY = os.getenv("DEFAULT_CITY", "Delhi")
-
 # --- NEWS SECTION HELPER FUNCTION ---
 def get_weather_news():
     # Dummy function as I don't have the news_module
@@ -126,160 +121,169 @@ def create_footer_layout(languages_data):
 
 
 # Layout of the dashboard
-layout = html.Div([
-    dcc.Interval(id="interval-clock", interval=1000, n_intervals=0),
-    dcc.Store(id='city-store', data={'city': DEFAULT_CITY}),
-    dcc.Store(id='initial-load-trigger', data=0),
-
-    # --- TOP NAVIGATION BAR (NAVBAR) ---
-    html.Nav([
-        # Left side: ClimaView (Home Link) and Live Time
-        html.Div([
-            html.A(
-                html.H1(id="app-title-nav", className="app-title-nav", children=languages["EN"]["title"]), 
-                className="navbar-brand"
-            ),
-            html.Div(id="live-datetime-nav", className="live-datetime-nav")
-        ], className="navbar-left"),
-
-        # Right side: Navigation Links
-        html.Div([
-            dcc.Link("Home", href="/", className="nav-link"),
-            dcc.Link("Rainfall Info", href="/rainfall", className="nav-link"),
-            dcc.Link("Temperature", href="/temperature", className="nav-link"),
-            dcc.Link("Humidity", href="/humidity", className="nav-link"),
-            dcc.Link("Wind Pressure", href="/wind", className="nav-link"),
-            dcc.Link("Sea Level", href="/sea-level", className="nav-link"),
-        ], className="navbar-right"),
-    ], className="top-navbar"),
-    # ----------------------------------------
-
-    # HAMBURGER + SIDEBAR WRAPPER 
-    html.Div([
-        # Hamburger button (Fixed Position in CSS)
-        html.Button("☰", id="menu-btn", className="menu-icon")
-        ,
-
-        # LEFT SIDEBAR - Initial state is hidden via CSS transform
-        html.Div([
-            # Sidebar Content goes here
-            html.H4("Controls", style={"marginTop": "0"}),
-            html.Hr(),
-            html.P(languages["EN"]["select_year"]),
-            dcc.RangeSlider(
-                id="year-slider",
-                min=min_year,
-                max=max_year,
-                step=1,
-                value=[min_year, max_year],
-                marks={str(year): str(year) for year in range(min_year, max_year + 1, 10)},
-                tooltip={"placement": "bottom", "always_visible": False},
-                className="range-slider"
-            ),
-            html.Br(),
-            html.Button(languages["EN"]["download"], id="download-map-btn", className="action-button sidebar-btn"),
-            html.Hr(),
-            # You can add other controls/links here
-            dcc.Link("Data Table View", href="/data-table", className="nav-link sidebar-link"),
-        ], className="sidebar-panel", id="sidebar-panel"), 
-    ], className="menu-wrapper"),
-
-    # MAIN CONTENT 
-    html.Div([
-        # New City Temperature Section (Existing)
-        html.Div([
+def layout(**kwargs):
+    min_year, max_year = _year_bounds()
+    return html.Div([
+        dcc.Interval(id="interval-clock", interval=1000, n_intervals=0),
+        dcc.Interval(id="tip-interval", interval=TIP_ROTATE_SECONDS * 1000, n_intervals=0),
+        dcc.Store(id="ai-tips-store", data=ai_tips),
+        dcc.Store(id='city-store', data={'city': DEFAULT_CITY}),
+        dcc.Store(id='initial-load-trigger', data=0),
+        # Download Map: rendered in a worker process (data/export_jobs.py), polled until ready
+        dcc.Store(id="dashboard-map-export-job"),
+        dcc.Interval(id="dashboard-map-export-poll", interval=1000, disabled=True),
+        dcc.Download(id="dashboard-map-download"),
+
+        # --- TOP NAVIGATION BAR (NAVBAR) ---
+        html.Nav([
+            # Left side: ClimaView (Home Link) and Live Time
+            html.Div([
+                html.A(
+                    html.H1(id="app-title-nav", className="app-title-nav", children=languages["EN"]["title"]), 
+                    className="navbar-brand"
+                ),
+                html.Div(id="live-datetime-nav", className="live-datetime-nav")
+            ], className="navbar-left"),
+
+            # Right side: Navigation Links
             html.Div([
-                dcc.Input(id="city-input", type="text", placeholder="Enter city....", className="input", style={"width": "30%", "marginRight": "10px"}, value=DEFAULT_CITY),
-                html.Button(id="api-button", className="action-button", children=languages["EN"]["get_temp"]),
-            ], style={"display": "flex", "alignItems": "center", "gap": "10px"}),
-            html.Div(id="api-output", className="temperature-output-box", style={"marginTop": "10px"})
-        ], className="city-temperature-section", style={"marginBottom": "20px"}),
+                dcc.Link("Home", href="/", className="nav-link"),
+                dcc.Link("Rainfall Info", href="/rainfall", className="nav-link"),
+                dcc.Link("Temperature", href="/temperature", className="nav-link"),
+                dcc.Link("Humidity", href="/humidity", className="nav-link"),
+                dcc.Link("Wind Pressure", href="/wind", className="nav-link"),
+                dcc.Link("Sea Level", href="/sea-level", className="nav-link"),
+            ], className="navbar-right"),
+        ], className="top-navbar"),
+        # ----------------------------------------
+
+        # HAMBURGER + SIDEBAR WRAPPER 
+        html.Div([
+            # Hamburger button (Fixed Position in CSS)
+            html.Button("☰", id="menu-btn", className="menu-icon")
+            ,
 
-        # India's Climate Insights Section (Existing)
+            # LEFT SIDEBAR - Initial state is hidden via CSS transform
+            html.Div([
+                # Sidebar Content goes here
+                html.H4("Controls", style={"marginTop": "0"}),
+                html.Hr(),
+                html.P(languages["EN"]["select_year"]),
+                dcc.RangeSlider(
+                    id="year-slider",
+                    min=min_year,
+                    max=max_year,
+                    step=1,
+                    value=[min_year, max_year],
+                    marks={str(year): str(year) for year in range(min_year, max_year + 1, 10)},
+                    tooltip={"placement": "bottom", "always_visible": False},
+                    className="range-slider"
+                ),
+                html.Br(),
+                html.Button(languages["EN"]["download"], id="download-map-btn", className="action-button sidebar-btn"),
+                html.Div(id="dashboard-map-export-status"),
+                html.Hr(),
+                # You can add other controls/links here
+                dcc.Link("Data Table View", href="/data-table", className="nav-link sidebar-link"),
+            ], className="sidebar-panel", id="sidebar-panel"), 
+        ], className="menu-wrapper"),
+
+        # MAIN CONTENT 
         html.Div([
-            html.H3("India's Climate Insights", style={"fontSize":"30px", "marginTop": "50px", "marginBottom": "20px", "color": "white"}),
+            # New City Temperature Section (Existing)
             html.Div([
                 html.Div([
-                    html.I(className="fas fa-cloud-rain", style={"fontSize": "24px", "marginBottom": "5px"}),
-                    html.H4("Rainfall Information", style={"marginBottom": "5px"}),
-                    html.P("Explore rainfall data", style={"fontSize": "12px"}),
-                    html.A("Explore Now", href="/rainfall", style={"fontSize": "12px"})
-                ], className="service-block"),
-                html.Div([
-                    html.I(className="fas fa-sun", style={"fontSize": "24px", "marginBottom": "5px"}),
-                    html.H4("Temperature Trends", style={"marginBottom": "5px"}),
-                    html.P("Analyze long-term temperature shifts", style={"fontSize": "12px"}),
-                    html.A("Learn More", href="/temperature", style={"fontSize": "12px"})
-                ], className="service-block"),
-                html.Div([
-                    html.I(className="fas fa-wind", style={"fontSize": "24px", "marginBottom": "5px"}),
-                    html.H4("Wind Speed Analysis", style={"marginBottom": "5px"}),
-                    html.P("View current and past wind data", style={"fontSize": "12px"}),
-                    html.A("See Details", href="/wind", style={"fontSize": "12px"})
-                ], className="service-block"),
-            ], className="services-row", style={"marginBottom": "0px"}),
+                    dcc.Input(id="city-input", type="text", placeholder="Enter city....", className="input", style={"width": "30%", "marginRight": "10px"}, value=DEFAULT_CITY),
+                    html.Button(id="api-button", className="action-button", children=languages["EN"]["get_temp"]),
+                ], style={"display": "flex", "alignItems": "center", "gap": "10px"}),
+                html.Div(id="api-output", className="temperature-output-box", style={"marginTop": "10px"})
+            ], className="city-temperature-section", style={"marginBottom": "20px"}),
+
+            # India's Climate Insights Section (Existing)
             html.Div([
+                html.H3("India's Climate Insights", style={"fontSize":"30px", "marginTop": "50px", "marginBottom": "20px", "color": "white"}),
                 html.Div([
-                    html.I(className="fas fa-tint", style={"fontSize": "24px", "marginBottom": "5px"}),
-                    html.H4("Humidity Levels", style={"marginBottom": "5px"}),
-                    html.P("Track changes in atmospheric moisture", style={"fontSize": "12px"}),
-                    html.A("View Data", href="/humidity", style={"fontSize": "12px"})
-                ], className="service-block"),
-                html.Div([
-                    html.I(className="fas fa-thermometer-half", style={"fontSize": "24px", "marginBottom": "5px"}),
-                    html.H4("Seasonal Variations", style={"marginBottom": "5px"}),
-                    html.P("Observe temperature patterns across seasons", style={"fontSize": "12px"}),
-                    html.A("Discover Trends", href="/seasonal", style={"fontSize": "12px"})
-                ], className="service-block"),
+                    html.Div([
+                        html.I(className="fas fa-cloud-rain", style={"fontSize": "24px", "marginBottom": "5px"}),
+                        html.H4("Rainfall Information", style={"marginBottom": "5px"}),
+                        html.P("Explore rainfall data", style={"fontSize": "12px"}),
+                        html.A("Explore Now", href="/rainfall", style={"fontSize": "12px"})
+                    ], className="service-block"),
+                    html.Div([
+                        html.I(className="fas fa-sun", style={"fontSize": "24px", "marginBottom": "5px"}),
+                        html.H4("Temperature Trends", style={"marginBottom": "5px"}),
+                        html.P("Analyze long-term temperature shifts", style={"fontSize": "12px"}),
+                        html.A("Learn More", href="/temperature", style={"fontSize": "12px"})
+                    ], className="service-block"),
+                    html.Div([
+                        html.I(className="fas fa-wind", style={"fontSize": "24px", "marginBottom": "5px"}),
+                        html.H4("Wind Speed Analysis", style={"marginBottom": "5px"}),
+                        html.P("View current and past wind data", style={"fontSize": "12px"}),
+                        html.A("See Details", href="/wind", style={"fontSize": "12px"})
+                    ], className="service-block"),
+                ], className="services-row", style={"marginBottom": "0px"}),
                 html.Div([
-                    html.I(className="fas fa-chart-line", style={"fontSize": "24px", "marginBottom": "5px"}),
-                    html.H4("Climate Projections", style={"marginBottom": "5px"}),
-                    html.P("Explore future climate scenarios", style={"fontSize": "12px"}),
-                    html.A("View Forecasts", href="projections", style={"fontSize": "12px"})
-                ], className="service-block"),
-            ], className="services-row"),
-        ], className="our-climate-insights", style={"marginBottom": "20px"}),
+                    html.Div([
+                        html.I(className="fas fa-tint", style={"fontSize": "24px", "marginBottom": "5px"}),
+                        html.H4("Humidity Levels", style={"marginBottom": "5px"}),
+                        html.P("Track changes in atmospheric moisture", style={"fontSize": "12px"}),
+                        html.A("View Data", href="/humidity", style={"fontSize": "12px"})
+                    ], className="service-block"),
+                    html.Div([
+                        html.I(className="fas fa-thermometer-half", style={"fontSize": "24px", "marginBottom": "5px"}),
+                        html.H4("Seasonal Variations", style={"marginBottom": "5px"}),
+                        html.P("Observe temperature patterns across seasons", style={"fontSize": "12px"}),
+                        html.A("Discover Trends", href="/seasonal", style={"fontSize": "12px"})
+                    ], className="service-block"),
+                    html.Div([
+                        html.I(className="fas fa-chart-line", style={"fontSize": "24px", "marginBottom": "5px"}),
+                        html.H4("Climate Projections", style={"marginBottom": "5px"}),
+                        html.P("Explore future climate scenarios", style={"fontSize": "12px"}),
+                        html.A("View Forecasts", href="projections", style={"fontSize": "12px"})
+                    ], className="service-block"),
+                ], className="services-row"),
+            ], className="our-climate-insights", style={"marginBottom": "20px"}),
         
-        # Global Climate Metrics Section (Existing)
-        html.Div([
-            html.H3("Global Climate Metrics", style={"fontSize":"30px", "marginTop": "50px", "marginBottom": "20px", "color": "white"}),
+            # Global Climate Metrics Section (Existing)
             html.Div([
+                html.H3("Global Climate Metrics", style={"fontSize":"30px", "marginTop": "50px", "marginBottom": "20px", "color": "white"}),
                 html.Div([
-                    html.I(className="fas fa-globe-americas", style={"fontSize": "24px", "marginBottom": "5px"}),
-                    html.H4("World Insights", style={"marginBottom": "5px"}),
-                    html.P("Analyze climate trends across the globe.", style={"fontSize": "12px"}),
-                    html.A("View Trends", href="/global-metrics", style={"fontSize": "12px"})
-                ], className="service-block"),
-                # New Data Table service box
-                html.Div([
-                    html.I(className="fas fa-table", style={"fontSize": "24px", "marginBottom": "5px"}),
-                    html.H4("Data Table", style={"marginBottom": "5px"}),
-                    html.P("View and filter historical global climate data.", style={"fontSize": "12px"}),
-                    html.A("Explore Data", href="/data-table", style={"fontSize": "12px"})
-                ], className="service-block"),
-                html.Div([
-                    html.I(className="fas fa-water", style={"fontSize": "24px", "marginBottom": "5px"}), 
-                    html.H4("Sea Level", style={"marginBottom": "5px"}),
-                    html.P("Analyze the sea level across globe", style={"fontSize": "12px"}),
-                    html.A("Explore Data", href="/sea-level", style={"fontSize": "12px"})
-                ], className="service-block"),
-            ], className="services-row", style={"marginBottom": "20px"}),
-        ], className="our-climate-insights", style={"marginBottom": "20px"}),
-
-        # News Section (Existing)
-        create_news_section_layout(),
+                    html.Div([
+                        html.I(className="fas fa-globe-americas", style={"fontSize": "24px", "marginBottom": "5px"}),
+                        html.H4("World Insights", style={"marginBottom": "5px"}),
+                        html.P("Analyze climate trends across the globe.", style={"fontSize": "12px"}),
+                        html.A("View Trends", href="/global-metrics", style={"fontSize": "12px"})
+                    ], className="service-block"),
+                    # New Data Table service box
+                    html.Div([
+                        html.I(className="fas fa-table", style={"fontSize": "24px", "marginBottom": "5px"}),
+                        html.H4("Data Table", style={"marginBottom": "5px"}),
+                        html.P("View and filter historical global climate data.", style={"fontSize": "12px"}),
+                        html.A("Explore Data", href="/data-table", style={"fontSize": "12px"})
+                    ], className="service-block"),
+                    html.Div([
+                        html.I(className="fas fa-water", style={"fontSize": "24px", "marginBottom": "5px"}), 
+                        html.H4("Sea Level", style={"marginBottom": "5px"}),
+                        html.P("Analyze the sea level across globe", style={"fontSize": "12px"}),
+                        html.A("Explore Data", href="/sea-level", style={"fontSize": "12px"})
+                    ], className="service-block"),
+                ], className="services-row", style={"marginBottom": "20px"}),
+            ], className="our-climate-insights", style={"marginBottom": "20px"}),
+
+            # News Section (Existing)
+            create_news_section_layout(),
         
-        html.Div([
-            html.H2(id="ai-tips-title", children=languages["EN"]["ai_tips"]),
-            html.Div(id="ai-tip-box")
-        ], className="ai-tips-sidebar"),
-    ], className="main-content", id="main-content"),
+            html.Div([
+                html.H2(id="ai-tips-title", children=languages["EN"]["ai_tips"]),
+                html.Div(id="ai-tip-box")
+            ], className="ai-tips-sidebar"),
+        ], className="main-content", id="main-content"),
 
-    # --- FOOTER SECTION (NEWLY ADDED) ---
-    create_footer_layout(languages) 
-    # -------------------------------------
+        # --- FOOTER SECTION (NEWLY ADDED) ---
+        create_footer_layout(languages) 
+        # -------------------------------------
 
-], style={"display": "flex", "flexDirection": "column"})
+    ], style={"display": "flex", "flexDirection": "column"})
 
 # --- CALLBACKS ---
 
@@ -291,32 +295,14 @@ layout = html.Div([
 def set_default_city(data):
     return data['city'] if data and 'city' in data else DEFAULT_CITY
 
-# Toggle sidebar (Existing)
-@callback(
+# Toggle sidebar (runs in the browser, see assets/clientside.js)
+clientside_callback(
+    ClientsideFunction(namespace="climaview", function_name="toggleSidebar"),
     Output("sidebar-panel", "className"),
     Input("menu-btn", "n_clicks"),
     State("sidebar-panel", "className"),
     prevent_initial_call=True
 )
-def toggle_sidebar(n_clicks, current_sidebar_class):
-    
-    # Initialize class if it's None/missing
-    if current_sidebar_class is None:
-        current_sidebar_class = "sidebar-panel"
-    
-    is_open = "open" in current_sidebar_class.split()
-
-    if is_open:
-        # Hide Sidebar
-        new_sidebar_class = current_sidebar_class.replace(" open", "").strip()
-    else:
-        # Show Sidebar
-        if not current_sidebar_class.startswith("sidebar-panel"):
-            new_sidebar_class = "sidebar-panel open"
-        else:
-             new_sidebar_class = current_sidebar_class + " open"
-
-    return new_sidebar_class
 
 
 # API Temp (Existing)
@@ -343,22 +329,53 @@ def fetch_temp(n_clicks, initial_load_data, city):
 
     return no_update
 
-# Live Clock Callback (Existing)
-@callback(
-    Output("live-datetime-nav", "children"), 
+# Live clock and tip rotation run in the browser: an idle tab makes no server requests
+clientside_callback(
+    ClientsideFunction(namespace="climaview", function_name="dashboardClock"),
+    Output("live-datetime-nav", "children"),
     Input("interval-clock", "n_intervals")
 )
-def update_datetime(n):
-    now = datetime.datetime.now()
-    return now.strftime("%Y-%m-%d %H:%M:%S")
 
-# AI Tip (Existing)
-@callback(
+clientside_callback(
+    ClientsideFunction(namespace="climaview", function_name="rotateTip"),
     Output("ai-tip-box", "children"),
-    Input("interval-clock", "n_intervals")
+    Input("tip-interval", "n_intervals"),
+    State("ai-tips-store", "data"),
+    State("ai-tip-box", "children")
 )
 
-def update_ai_tips(n):
-    # This interval runs every second, but you might want to change the tip less often.
-    # For now, it changes on every interval run.
-    return random.choice(ai_tips)
\ No newline at end of file
+
+# Download Map: temperature map for the last year of the slider range
+@callback(
+    Output("dashboard-map-export-job", "data"),
+    Output("dashboard-map-export-poll", "disabled"),
+    Output("dashboard-map-export-status", "children"),
+    Input("download-map-btn", "n_clicks"),
+    State("year-slider", "value"),
+    prevent_initial_call=True
+)
+def download_map(n_clicks, year_range):
+    year = year_range[-1] if year_range else _year_bounds()[1]
+    job = export_jobs.submit("temperature_map", year)
+    if "error" in job:
+        return None, True, job["error"]
+    return job, False, "Preparing map image..."
+
+
+@callback(
+    Output("dashboard-map-download", "data"),
+    Output("dashboard-map-export-poll", "disabled", allow_duplicate=True),
+    Output("dashboard-map-export-status", "children", allow_duplicate=True),
+    Input("dashboard-map-export-poll", "n_intervals"),
+    State("dashboard-map-export-job", "data"),
+    prevent_initial_call=True
+)
+def poll_map_download(n, job):
+    if not job:
+        return no_update, True, ""
+    status = export_jobs.result(job)
+    if "error" in status:
+        return no_update, True, status["error"]
+    if status["status"] == "pending":
+        return no_update, False, no_update
+    return dcc.send_file(status["path"], filename=job["filename"]), True, ""
@@ -1,14 +1,14 @@
-from dash import html, dcc, dash_table, Input, Output, callback
-import pandas as pd
+from dash import html, dcc, dash_table, Input, Output, callback, ctx
 import dash
+from urllib.parse import urlencode
+
+from data.climate_export import HAS_PYARROW
+from data.climate_repository import countries, get_climate_df, select, year_bounds
+from data.table_query import apply_filter_and_sort, page_of
 
 # Register the page
 dash.register_page(__name__, path='/data-table', name='Data Table')
 
-# Load the climate data
-df = pd.read_csv("data/climate.csv")
-df["Year"] = df["Year"].astype(int)
-
 # English language support
 languages = {
     "EN": {
@@ -18,56 +18,108 @@ languages = {
     }
 }
 
-min_year = df["Year"].min()
-max_year = df["Year"].max()
-
-layout = html.Div([
-    html.H1("Climate Data Table", className="app-title"),
+# Built per page load, so a reloaded dataset's years, countries and columns reach the page
+def layout(**kwargs):
+    min_year, max_year = year_bounds()
+    return html.Div([
+        html.H1("Climate Data Table", className="app-title"),
 
-    html.Hr(style={"borderTop": "2px solid #bbb", "marginTop":"10px", "marginBottom":"20px"}),
-    dcc.Link(html.Button("Go to Dashboard"), href="/dashboard", style={"marginTop":"20px", "background-color":"#2C4057","color":"#2C4057","padding":"10px", "border":"none", "borderRadius":"10px", "cursor":"pointer"}),
+        html.Hr(style={"borderTop": "2px solid #bbb", "marginTop":"10px", "marginBottom":"20px"}),
+        dcc.Link(html.Button("Go to Dashboard"), href="/dashboard", style={"marginTop":"20px", "background-color":"#2C4057","color":"#2C4057","padding":"10px", "border":"none", "borderRadius":"10px", "cursor":"pointer"}),
 
-    html.P("View and filter historical climate data by year and country.", className="description", style={"color": "white", "fontSize":"20px","marginBottom":"20px", "marginTop":"20px"}),
+        html.P("View and filter historical climate data by year and country. Clear a dropdown to browse every year or country.", className="description", style={"color": "white", "fontSize":"20px","marginBottom":"20px", "marginTop":"20px"}),
 
-    html.Div([
         html.Div([
-            html.Label("📅 Select Year:", style={"color": "white", "fontSize":"18px",}),            dcc.Dropdown(
-                id="year-dropdown-table",
-                className="year-dropdown",  # <--- यह नई क्लास जोड़ी गई है
-                options=[{"label": str(y), "value": y} for y in range(min_year, max_year + 1)],
-                value=min_year
-            )
-        ], className="dropdown-container", style={"flex": "1"}),
+            html.Div([
+                html.Label("📅 Select Year:", style={"color": "white", "fontSize":"18px",}),            dcc.Dropdown(
+                    id="year-dropdown-table",
+                    className="year-dropdown",  # <--- यह नई क्लास जोड़ी गई है
+                    options=[{"label": str(y), "value": y} for y in range(min_year, max_year + 1)],
+                    value=min_year
+                )
+            ], className="dropdown-container", style={"flex": "1"}),
         
-        html.Div([
-            html.Label("Select Country:",style={"color": "white", "fontSize":"18px", "marginTop":"10px", "marginBottom":"30px"}),
-            dcc.Dropdown(
-                id="country-dropdown-table",
-                className="year-dropdown",  # <--- यह नई क्लास जोड़ी गई है
-                options=[{"label": c, "value": c} for c in sorted(df["Country"].unique())],
-                value="India"
-            )
-        ], className="dropdown-container", style={"flex": "1"})
-    ], className="selectors-row"),
+            html.Div([
+                html.Label("Select Country:",style={"color": "white", "fontSize":"18px", "marginTop":"10px", "marginBottom":"30px"}),
+                dcc.Dropdown(
+                    id="country-dropdown-table",
+                    className="year-dropdown",  # <--- यह नई क्लास जोड़ी गई है
+                    options=[{"label": c, "value": c} for c in countries()],
+                    value="India"
+                )
+            ], className="dropdown-container", style={"flex": "1"})
+        ], className="selectors-row"),
     
-    html.H2("Filtered Data", style={"fontSize": "24px", "marginTop": "30px", "color": "white"}),
+        html.H2("Filtered Data", style={"fontSize": "24px", "marginTop": "30px", "color": "white"}),
     
-    dash_table.DataTable(
-        id="data-table-page",
-        columns=[{"name": i, "id": i} for i in df.columns],
-        data=[],
-        page_size=10,
-        filter_action="native",
-        sort_action="native",
-        style_table={"overflowX": "auto"}
-    )
-], className="page-content")
+        dash_table.DataTable(
+            id="data-table-page",
+            columns=[{"name": i, "id": i} for i in get_climate_df().columns],
+            data=[],
+            # Paging, filtering and sorting run on the server; the browser only holds one page
+            page_current=0,
+            page_size=10,
+            page_action="custom",
+            filter_action="custom",
+            filter_query="",
+            sort_action="custom",
+            sort_mode="multi",
+            sort_by=[],
+            style_table={"overflowX": "auto"}
+        ),
+        html.Div(id="data-table-error", style={"color": "red", "marginTop": "10px"}),
+        html.Div(id="data-table-export", style={"marginTop": "15px", "display": "flex", "gap": "15px"})
+    ], className="page-content")
 
 @callback(
     Output("data-table-page", "data"),
+    Output("data-table-page", "page_count"),
+    Output("data-table-page", "page_current"),
+    Output("data-table-error", "children"),
+    Input("year-dropdown-table", "value"),
+    Input("country-dropdown-table", "value"),
+    Input("data-table-page", "page_current"),
+    Input("data-table-page", "page_size"),
+    Input("data-table-page", "filter_query"),
+    Input("data-table-page", "sort_by")
+)
+def update_data_table_page(selected_year, selected_country, page_current, page_size, filter_query, sort_by):
+    # A cleared dropdown means "all years" / "all countries"
+    filtered_df = select(year=selected_year, country=selected_country)
+    try:
+        filtered_df = apply_filter_and_sort(filtered_df, filter_query, sort_by)
+    except ValueError as e:
+        return [], 1, 0, str(e)
+
+    # A new year/country/filter/sort starts again from the first page
+    if "data-table-page.page_current" not in ctx.triggered_prop_ids:
+        page_current = 0
+    page, page_count = page_of(filtered_df, page_current, page_size)
+
+    # float32 storage -> round for display so 25.87 isn't shown as 25.8700008
+    records = page.astype({"CO2": "float64", "Temperature": "float64"}).round(4).to_dict("records")
+    return records, page_count, page_current, ""
+
+
+# Export links for the current selection (streamed by /export/climate.<fmt> in app.py)
+@callback(
+    Output("data-table-export", "children"),
     Input("year-dropdown-table", "value"),
-    Input("country-dropdown-table", "value")
+    Input("country-dropdown-table", "value"),
+    Input("data-table-page", "filter_query"),
+    Input("data-table-page", "sort_by")
 )
-def update_data_table_page(selected_year, selected_country):
-    filtered_df = df[(df["Year"] == selected_year) & (df["Country"] == selected_country)]
-    return filtered_df.to_dict("records")
\ No newline at end of file
+def update_export_links(selected_year, selected_country, filter_query, sort_by):
+    params = {
+        "year": selected_year,
+        "country": selected_country,
+        "filter": filter_query,
+        "sort": ",".join(f"{s['column_id']}:{s['direction']}" for s in sort_by or []),
+    }
+    query = urlencode({k: v for k, v in params.items() if v not in (None, "")})
+    # Parquet only when pyarrow is installed; the route answers 501 without it
+    formats = (("csv", "CSV"), ("parquet", "Parquet")) if HAS_PYARROW else (("csv", "CSV"),)
+    return [
+        html.A(f"⬇ Export {label}", href=f"/export/climate.{fmt}?{query}", className="action-button", target="_blank")
+        for fmt, label in formats
+    ]
@@ -1,80 +1,102 @@
-from dash import html, dcc, Input, Output, callback, State
-import pandas as pd
+from dash import html, dcc, Input, Output, callback, State, no_update
 import plotly.express as px
 import dash
 import os
 from dotenv import load_dotenv
 
-dash.register_page(__name__, path='/global-metrics', name='Global Metrics')
+from data.climate_repository import countries, materialize, select, year_bounds
+from data import export_jobs
+from data.climate_figures import choropleth, start_prewarm
+from data.climate_views import global_temperature_trend
 
-df = pd.read_csv("data/climate.csv")
-df["Year"] = df["Year"].astype(int)
-ranked_df = df.copy()
-ranked_df["Rank"] = ranked_df.groupby("Year")["Temperature"].rank(ascending=False)
+dash.register_page(__name__, path='/global-metrics', name='Global Metrics')
 
 load_dotenv()
 API_KEY = os.getenv("OPENWEATHER_API_KEY")
 
-min_year = df["Year"].min()
-max_year = df["Year"].max()
+# Build every year's maps in the background so the first dropdown changes are already cached
+start_prewarm()
 
-layout = html.Div([
-    html.H1("Global Climate Metrics", className="app-title"),
+# Built per page load, so a reloaded dataset's years and countries reach the dropdowns
+def layout(**kwargs):
+    min_year, max_year = year_bounds()
+    return html.Div([
+        html.H1("Global Climate Metrics", className="app-title"),
 
-    html.Hr(style={"borderTop": "2px solid #bbb", "marginTop":"10px", "marginBottom":"20px"}),
-    dcc.Link(html.Button("Go to Dashboard", id="to-dashboard", className="action-button"), href="/dashboard", refresh=True),
-    html.P("Explore detailed graphs and trends for global climate data.", className="description", style={"color": "white", "fontSize":"22px","marginBottom":"20px", "marginTop":"20px"}), 
+        html.Hr(style={"borderTop": "2px solid #bbb", "marginTop":"10px", "marginBottom":"20px"}),
+        dcc.Link(html.Button("Go to Dashboard", id="to-dashboard", className="action-button"), href="/dashboard", refresh=True),
+        html.P("Explore detailed graphs and trends for global climate data.", className="description", style={"color": "white", "fontSize":"22px","marginBottom":"20px", "marginTop":"20px"}), 
     
-    html.Div([
-        html.Label("📅 Select Year:", style={"color": "white", "fontSize":"18px",}),
-        dcc.Dropdown(
-            id="year-dropdown-metrics",
-            className="year-dropdown",style={"marginTop":"5px","marginBottom":"15px"},  # <--- यह नई क्लास जोड़ी गई है
-            options=[{"label": str(y), "value": y} for y in range(min_year, max_year + 1)],
-            value=min_year
-        ),
-    ]),
-
-    html.Div([
-        html.Label("Select Country:",style={"color": "white", "fontSize":"18px", "marginTop":"20px", "marginBottom":"20px"}),
-        dcc.Dropdown(
-            id="country-dropdown-metrics",
-            className="year-dropdown",style={"marginTop":"5px"},  # <--- यह नई क्लास जोड़ी गई है
-            options=[{"label": c, "value": c} for c in sorted(df["Country"].unique())],
-            value="India"
-        ),
-
-        html.Button(id="download-btn", children="Download Map", className="action-button",style={"marginTop":"20px", "marginBottom":"20px"}),
-        dcc.Download(id="download-image"),
-    ], style={"display": "left", "alignItems": "left", "gap": "20px","marginBottom": "20px"}),
-
-    dcc.Graph(id="world-map-metrics", style={"marginTop":"30px"}),
-    dcc.Graph(id="co2-graph-metrics",style={"marginTop":"30px"}),
-    dcc.Graph(id="global-temp-trend-metrics",style={"marginTop":"30px"}),
-    dcc.Graph(id="scatter-co2-temp-metrics",style={"marginTop":"30px"}),
-
-], className="main-content")
+        html.Div([
+            html.Label("📅 Select Year:", style={"color": "white", "fontSize":"18px",}),
+            dcc.Dropdown(
+                id="year-dropdown-metrics",
+                className="year-dropdown",style={"marginTop":"5px","marginBottom":"15px"},  # <--- यह नई क्लास जोड़ी गई है
+                options=[{"label": str(y), "value": y} for y in range(min_year, max_year + 1)],
+                value=min_year
+            ),
+        ]),
+
+        html.Div([
+            html.Label("Select Country:",style={"color": "white", "fontSize":"18px", "marginTop":"20px", "marginBottom":"20px"}),
+            dcc.Dropdown(
+                id="country-dropdown-metrics",
+                className="year-dropdown",style={"marginTop":"5px"},  # <--- यह नई क्लास जोड़ी गई है
+                options=[{"label": c, "value": c} for c in countries()],
+                value="India"
+            ),
+
+            html.Button(id="download-btn", children="Download Map", className="action-button",style={"marginTop":"20px", "marginBottom":"20px"}),
+            dcc.Download(id="download-image"),
+            # PNG export runs in a worker process (data/export_jobs.py); poll until it's on disk
+            dcc.Store(id="map-export-job"),
+            dcc.Interval(id="map-export-poll", interval=1000, disabled=True),
+            html.Div(id="map-export-status", style={"color": "white"}),
+        ], style={"display": "left", "alignItems": "left", "gap": "20px","marginBottom": "20px"}),
+
+        dcc.Graph(id="world-map-metrics", style={"marginTop":"30px"}),
+        dcc.Graph(id="co2-graph-metrics",style={"marginTop":"30px"}),
+        dcc.Graph(id="global-temp-trend-metrics",style={"marginTop":"30px"}),
+        dcc.Graph(id="scatter-co2-temp-metrics",style={"marginTop":"30px"}),
+
+    ], className="main-content")
 
 
 # Download callback ko yahan shift kar diya gaya hai
 @callback(
-    Output("download-image", "data"),
+    Output("map-export-job", "data"),
+    Output("map-export-poll", "disabled"),
+    Output("map-export-status", "children"),
     Input("download-btn", "n_clicks"),
     State("year-dropdown-metrics", "value"),
     prevent_initial_call=True
 )
 def download(n, year):
-    f = df[df["Year"] == year]
-    fig = px.choropleth(
-        f,
-        locations="Country",
-        locationmode="country names",
-        color="Temperature",
-        hover_name="Country",
-        color_continuous_scale="YlOrRd",
-        title=f"Global Temperature in {year}"
-    )
-    return dcc.send_bytes(fig.to_image(format="png"), filename=f"map_{year}.png")
+    if year is None:
+        return None, True, "Please select a year first."
+    job = export_jobs.submit("temperature_map", year)
+    if "error" in job:
+        return None, True, job["error"]
+    return job, False, "Preparing map image..."
+
+
+@callback(
+    Output("download-image", "data"),
+    Output("map-export-poll", "disabled", allow_duplicate=True),
+    Output("map-export-status", "children", allow_duplicate=True),
+    Input("map-export-poll", "n_intervals"),
+    State("map-export-job", "data"),
+    prevent_initial_call=True
+)
+def poll_download(n, job):
+    if not job:
+        return no_update, True, ""
+    status = export_jobs.result(job)
+    if "error" in status:
+        return no_update, True, status["error"]
+    if status["status"] == "pending":
+        return no_update, False, no_update
+    return dcc.send_file(status["path"], filename=job["filename"]), True, ""
 
 
 # Callbacks for the graphs on the new page
@@ -85,23 +107,11 @@ def download(n, year):
     Input("year-dropdown-metrics", "value")
 )
 def update_map(selected_year):
-    filtered = ranked_df[ranked_df["Year"] == selected_year]
-    fig = px.choropleth(
-        filtered,
-        locations="Country",
-        locationmode="country names",
-        color="CO2",
-        hover_name="Country",
-        hover_data={"Temperature": ":.2f", "CO2": ":.2f"},
-        color_continuous_scale="Turbo", # Changed color scale
-        title=f"🌏 Global CO₂ Emissions - {selected_year}"
-    )
-    fig.update_geos(
-        visible=False, showcountries=True, countrycolor="gray", showocean=True, oceancolor="#b0e0e6",
-        showland=True, landcolor="#f0e68c", showlakes=True, lakecolor="#add8e6", projection_type="natural earth"
-    )
-    fig.update_layout(margin=dict(l=0, r=0, t=50, b=0), height=720)
-    return fig
+    # the dropdown was cleared; keep showing the last map
+    if selected_year is None:
+        return no_update
+    # prebuilt per year and dataset version (see data/climate_figures.py)
+    return choropleth("co2_map", selected_year)
 
 # CO₂ Graph Callback (Using an Area Chart)
 @callback(
@@ -109,22 +119,26 @@ def update_map(selected_year):
     Input("country-dropdown-metrics", "value")
 )
 def update_co2_graph(country):
-    cdf = df[df["Country"] == country]
+    cdf = select(country=country)
     fig = px.area(cdf, x="Year", y="CO2", title=f"📊 CO₂ Emissions Over Time — {country}") # Changed to area chart
     fig.update_traces(fill='tozeroy') # Optional: Fills the area to zero y-axis
     return fig
 
 # Temp Trend Callback (Using a Smoothed Line)
+# The trend ignores the selected year, so the figure is built once per dataset version
 @callback(
     Output("global-temp-trend-metrics", "figure"),
     Input("year-dropdown-metrics", "value")
 )
 def temp_trend(_):
-    avg_df = df.groupby("Year")["Temperature"].mean().reset_index()
+    return materialize("temp_trend_figure", _build_temp_trend_figure)
+
+
+def _build_temp_trend_figure(_df):
+    avg_df = global_temperature_trend()
     fig = px.line(avg_df, x="Year", y="Temperature", title="Global Average Temperature Over Time (with 10-Year Rolling Average)")
-    
+
     # Add a rolling average line for better trend visualization
-    avg_df['Rolling_Temp'] = avg_df['Temperature'].rolling(window=10).mean()
     fig.add_scatter(x=avg_df['Year'], y=avg_df['Rolling_Temp'], mode='lines', name='10-Year Rolling Average',
                      line=dict(color='red', width=3))
     return fig
@@ -135,7 +149,7 @@ def temp_trend(_):
     Input("year-dropdown-metrics", "value")
 )
 def scatter(year):
-    f = df[df["Year"] == year]
+    f = select(year=year)
     
     fig = px.scatter(
         f, x="CO2", y="Temperature", size="CO2", color="Country",
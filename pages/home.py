@@ -1,6 +1,5 @@
 import dash
-from dash import html, dcc, Input, Output
-import datetime
+from dash import html, dcc, Input, Output, clientside_callback, ClientsideFunction
 
 dash.register_page(__name__, path="/")
 
@@ -141,10 +140,9 @@ layout = html.Div([
     ], className="main-wrapper")
 ])
 
-@dash.callback(
+# Clock runs in the browser (assets/clientside.js): no server request per tick
+clientside_callback(
+    ClientsideFunction(namespace="climaview", function_name="homeClock"),
     Output("live-datetime", "children"),
     Input("interval-clock", "n_intervals")
 )
-def update_clock(n):
-    now = datetime.datetime.now().strftime("%A, %d %B %Y | %I:%M:%S %p")
-    return now
@@ -73,19 +73,43 @@ def fetch_forecast(n_clicks, city):
         if not forecast_list:
             return html.Div(f"No forecast data available for {city_name}.", className="api-error")
 
-        # Create forecast cards for each day
+        # Create forecast cards for each day (aggregated over all its 3-hour slots)
         forecast_cards = [
             html.Div([
                 html.P(item["date"], className="forecast-date"),
-                html.P(f"Temp: {item['temp_celsius']}°C"),
+                html.P(f"Temp: {item['temp_min']}–{item['temp_max']}°C (avg {item['temp_celsius']}°C)"),
                 html.P(f"Weather: {item['weather_desc']}"),
                 html.P(f"Humidity: {item['humidity_percent']}%"),
-                html.P(f"Wind: {item['wind_speed_kmh']} km/h"),
+                html.P(f"Precipitation: {item['precip_mm']} mm"),
+                html.P(f"Peak wind: {item['wind_speed_kmh']} km/h"),
             ], className="forecast-card")
             for item in forecast_list
         ]
-        
+
         return html.Div([
             html.H4(f"5-Day Forecast for {city_name}"),
-            html.Div(forecast_cards, className="forecast-cards-container")
-        ], className="api-success")
\ No newline at end of file
+            html.Div(forecast_cards, className="forecast-cards-container"),
+            dcc.Graph(figure=_series_figure(forecast_data["series"]), config={"displayModeBar": False}),
+        ], className="api-success")
+
+
+def _series_figure(series):
+    """3-hourly temperature line over precipitation bars, in the city's local time."""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=series["time"], y=series["precip_mm"], name="Precipitation (mm / 3 h)",
+        marker_color="rgba(30, 144, 255, 0.5)", yaxis="y2",
+    ))
+    fig.add_trace(go.Scatter(
+        x=series["time"], y=series["temp_celsius"], name="Temperature (°C)",
+        mode="lines+markers", line=dict(color="orangered"),
+    ))
+    fig.update_layout(
+        margin=dict(l=10, r=10, t=30, b=10),
+        height=320,
+        yaxis=dict(title="°C"),
+        yaxis2=dict(title="mm", overlaying="y", side="right", showgrid=False, rangemode="tozero"),
+        legend=dict(orientation="h", y=1.12),
+        hovermode="x unified",
+    )
+    return fig
@@ -1,21 +1,21 @@
+import os
+
 import dash
-from dash import dcc, html, callback, Input, Output
+from dash import dcc, html, callback, clientside_callback, Input, Output, State, ctx, no_update
 import pandas as pd
 import plotly.graph_objects as go
 import requests
-from datetime import datetime, timedelta
+
+from data import circuit_breaker
+from data.downsample import downsample_indices, target_points
+from data.noaa import STATIONS
+from data.noaa_pyramid import daily_rolling_mean, load_range
 
 dash.register_page(__name__, path='/sea-level', name='Sea Level')
 
-# Common NOAA stations (station_id: location name)
-STATIONS = {
-    "8518750": "New York, NY",
-    "9414290": "San Francisco, CA",
-    "8771341": "Galveston, TX",
-    "8410140": "Portland, ME",
-    "8723214": "Naples, FL",
-    "9432780": "Seattle, WA"
-}
+# First loads of a year download it from NOAA; the graph stops waiting after
+# this long (keeping the current figure) and the download finishes in the background
+SEA_LEVEL_BUDGET_SECONDS = float(os.getenv("SEA_LEVEL_BUDGET_SECONDS", "12"))
 
 layout = html.Div([
     html.H1("🌊 Global Sea Level Trends", className="app-title"),
@@ -49,77 +49,136 @@ layout = html.Div([
             value='2014',
             style={'width': '120px'}
         ),
+        html.Label("to",
+                   style={"color": "white", "fontSize": "18px"}),
+        dcc.Dropdown(
+            id="sea-level-end-year-dropdown",
+            options=[{"label": str(y), "value": str(y)} for y in range(2000, 2025)],
+            value=None,
+            placeholder="(optional)",
+            style={'width': '140px'}
+        ),
     ], style={"display": "flex", "alignItems": "center",
               "gap": "20px", "marginBottom": "20px"}),
 
     dcc.Graph(id="sea-level-graph", style={'marginTop': '30px', 'backgroundColor': "#7c7c7c"}),
+    # Rendered graph width in pixels, used to pick how many points to send
+    dcc.Store(id="sea-level-graph-width"),
     html.Div(id="error-message", style={'color': 'red', 'marginTop': '10px'})
 ], className="main-content")
 
 
+# Measure the graph's width in the browser so the server can size the series to it
+clientside_callback(
+    """
+    function(_) {
+        var el = document.getElementById("sea-level-graph");
+        return el ? el.offsetWidth : null;
+    }
+    """,
+    Output("sea-level-graph-width", "data"),
+    Input("sea-level-graph", "id"),
+)
+
+
+def _visible_range(relayout_data):
+    """Returns (start, end) timestamps of a zoomed x-axis, 'full' on reset, or None if the x-axis didn't change."""
+    if not relayout_data:
+        return None
+    if relayout_data.get("xaxis.autorange"):
+        return "full"
+    if "xaxis.range[0]" in relayout_data and "xaxis.range[1]" in relayout_data:
+        return pd.Timestamp(relayout_data["xaxis.range[0]"]), pd.Timestamp(relayout_data["xaxis.range[1]"])
+    if isinstance(relayout_data.get("xaxis.range"), list):
+        start, end = relayout_data["xaxis.range"][:2]
+        return pd.Timestamp(start), pd.Timestamp(end)
+    return None
+
+
+_LEVEL_NAMES = {
+    "raw": "6-Minute Water Level",
+    "hourly": "Hourly Mean Water Level",
+    "daily": "Daily Mean Water Level",
+    "monthly": "Monthly Mean Water Level",
+}
+
+
+def _load_view(station_id, start, end):
+    """(resolution, frame, trend series, trend name) for the window; the slow part of the callback."""
+    resolution, df = load_range(station_id, start, end)
+    # Trend line: a true 7-day mean from daily aggregates, or 12 months for long spans
+    if resolution == "monthly":
+        trend = df.set_index("Date_Time")["Water_Level"].rolling(12, min_periods=1).mean()
+        return resolution, df, trend, "12-Month Avg"
+    return resolution, df, daily_rolling_mean(station_id, start, end), "7-Day Avg"
+
+
 @callback(
     Output("sea-level-graph", "figure"),
     Output("error-message", "children"),
     Input("sea-label-year-dropdown", "value"),
-    Input("station-dropdown", "value")
+    Input("sea-level-end-year-dropdown", "value"),
+    Input("station-dropdown", "value"),
+    Input("sea-level-graph", "relayoutData"),
+    State("sea-level-graph-width", "data"),
 )
-def update_sea_level_graph(selected_year, station_id):
-    api_url = "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
+def update_sea_level_graph(selected_year, end_year, station_id, relayout_data, graph_width):
+    visible = None
+    if ctx.triggered_id == "sea-level-graph":
+        visible = _visible_range(relayout_data)
+        if visible is None:
+            # autosize, pan of the y-axis, etc. — nothing to re-sample
+            return no_update, no_update
+
+    first_year = int(selected_year)
+    last_year = max(first_year, int(end_year)) if end_year else first_year
+    span_start = pd.Timestamp(first_year, 1, 1)
+    span_end = pd.Timestamp(last_year, 12, 31, 23, 59)
+    view_start, view_end = span_start, span_end
+    if isinstance(visible, tuple):
+        # Re-request just the zoomed window, at the resolution its span calls for
+        view_start, view_end = max(visible[0], span_start), min(visible[1], span_end)
+    period = str(first_year) if first_year == last_year else f"{first_year}–{last_year}"
 
     try:
-        # Prepare date range (Jan–Dec)
-        start = datetime(int(selected_year), 1, 1)
-        end = datetime(int(selected_year), 12, 31)
-        all_data = []
-
-        while start <= end:
-            chunk_end = min(start + timedelta(days=30), end)
-            params = {
-                "begin_date": start.strftime("%Y%m%d"),
-                "end_date": chunk_end.strftime("%Y%m%d"),
-                "station": station_id,
-                "product": "water_level",
-                "datum": "MSL",
-                "units": "metric",
-                "time_zone": "gmt",
-                "application": "Dash_App",
-                "format": "json"
-            }
-
-            response = requests.get(api_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            if "data" in data:
-                all_data.extend(data["data"])
-
-            start = chunk_end + timedelta(days=1)
-
-        if not all_data:
-            return {}, f"No data available for {STATIONS[station_id]} in {selected_year}."
-
-        # Convert to DataFrame
-        df = pd.DataFrame(all_data)
-        df.rename(columns={'t': 'Date_Time', 'v': 'Water_Level'}, inplace=True)
-        df['Date_Time'] = pd.to_datetime(df['Date_Time'])
-        df['Water_Level'] = pd.to_numeric(df['Water_Level'])
-
-        # Rolling average
-        df['Rolling_Avg'] = df['Water_Level'].rolling(7, min_periods=1).mean()
-
-        # Extremes
-        high_water = df['Water_Level'].max()
-        low_water = df['Water_Level'].min()
-        high_date = df.loc[df['Water_Level'].idxmax(), 'Date_Time']
-        low_date = df.loc[df['Water_Level'].idxmin(), 'Date_Time']
+        loaded = circuit_breaker.noaa_pool.call(SEA_LEVEL_BUDGET_SECONDS, _load_view, station_id, view_start, view_end)
+        if loaded is circuit_breaker.OVER_BUDGET:
+            return no_update, f"NOAA is slow to respond; still loading {STATIONS[station_id]} for {period}. Try again in a moment."
+        # Frames may be shared with concurrent requests, so don't mutate them
+        resolution, df, trend, trend_name = loaded
+
+        if df.empty:
+            return {}, f"No data available for {STATIONS[station_id]} in {period}."
+
+        # Extremes (from the per-bucket max/min when aggregated)
+        max_col = "Max" if "Max" in df else "Water_Level"
+        min_col = "Min" if "Min" in df else "Water_Level"
+        high_water = df[max_col].max()
+        low_water = df[min_col].min()
+        high_date = df.loc[df[max_col].idxmax(), 'Date_Time']
+        low_date = df.loc[df[min_col].idxmin(), 'Date_Time']
+
+        # Downsample whatever is left to what the graph can show. Extremes are always kept.
+        times = df['Date_Time'].to_numpy()
+        levels = df['Water_Level'].to_numpy()
+        idx = downsample_indices(times.astype("int64"), levels, target_points(graph_width))
 
         # Plot
         fig = go.Figure()
-        fig.add_trace(go.Scatter(x=df['Date_Time'], y=df['Water_Level'],
-                                 mode='lines', name='Daily Water Level',
+        if resolution != "raw":
+            # min/max band of each bucket behind the mean line
+            fig.add_trace(go.Scatter(x=times[idx], y=df['Max'].to_numpy()[idx],
+                                     mode='lines', line=dict(width=0),
+                                     showlegend=False, hoverinfo='skip'))
+            fig.add_trace(go.Scatter(x=times[idx], y=df['Min'].to_numpy()[idx],
+                                     mode='lines', line=dict(width=0),
+                                     fill='tonexty', fillcolor='rgba(0,255,255,0.2)',
+                                     name=f"{resolution.capitalize()} Min–Max"))
+        fig.add_trace(go.Scatter(x=times[idx], y=levels[idx],
+                                 mode='lines', name=_LEVEL_NAMES[resolution],
                                  line=dict(color='cyan')))
-        fig.add_trace(go.Scatter(x=df['Date_Time'], y=df['Rolling_Avg'],
-                                 mode='lines', name='7-Day Avg',
+        fig.add_trace(go.Scatter(x=trend.index, y=trend.to_numpy(),
+                                 mode='lines', name=trend_name,
                                  line=dict(color='orange', width=2)))
         fig.add_trace(go.Scatter(x=[high_date], y=[high_water],
                                  mode='markers+text', name='Max Level',
@@ -131,17 +190,24 @@ def update_sea_level_graph(selected_year, station_id):
                                  text=["Min"], textposition='bottom center'))
 
         fig.update_layout(
-            title=f"Sea Level at {STATIONS[station_id]} ({station_id}) - {selected_year}",
+            title=f"Sea Level at {STATIONS[station_id]} ({station_id}) - {period}",
             plot_bgcolor='rgba(0,0,0,0)',
             paper_bgcolor='rgba(0,0,0,0)',
             font=dict(color="white"),
             xaxis_title="Date",
             yaxis_title="Water Level (m)",
-            legend=dict(orientation="h", y=-0.2)
+            legend=dict(orientation="h", y=-0.2),
+            # Keeps the user's zoom when the denser window is swapped in
+            uirevision=f"{station_id}-{first_year}-{last_year}",
         )
 
+        failed = df.attrs.get("failed", [])
+        if failed:
+            return fig, f"Partial data: NOAA did not return {', '.join(failed)}."
         return fig, ""
 
+    except circuit_breaker.CircuitOpenError as e:
+        return no_update, f"NOAA is temporarily unavailable; retrying in {max(1, round(e.retry_in))}s."
     except requests.exceptions.RequestException as e:
         return {}, f"Failed to fetch data from NOAA: {e}"
     except Exception as e:
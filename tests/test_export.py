@@ -0,0 +1,27 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client():
+    return app.server.test_client()
+
+
+@pytest.mark.parametrize("query, message", [
+    ("filter={CO2} > abc", b"CO2 needs a number"),
+    ("filter={Nope} > 1", b"Unknown column: Nope"),
+    ("year=abc", b"year must be a whole number"),
+])
+def test_bad_export_requests_are_rejected_before_streaming(client, query, message):
+    response = client.get(f"/export/climate.csv?{query}")
+    assert response.status_code == 400
+    assert message in response.get_data()
+
+
+def test_export_streams_the_filtered_selection(client):
+    response = client.get("/export/climate.csv?year=2014&filter={CO2} > 5")
+    assert response.status_code == 200
+    header, *rows = response.get_data(as_text=True).strip().splitlines()
+    assert header == "Country,Year,CO2,Temperature"
+    assert rows and all(float(r.split(",")[2]) > 5 and r.split(",")[1] == "2014" for r in rows)
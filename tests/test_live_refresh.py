@@ -0,0 +1,24 @@
+import pytest
+
+from data import fetch_data, live_refresh
+
+ROW = {"state": "Goa", "lat": 15.49, "lon": 73.83}
+
+
+def _weather(**wind):
+    return {"temp_celsius": 30.0, "humidity_percent": 70, "wind_speed_mps": 5.0, **wind}
+
+
+@pytest.mark.parametrize("blowing_from, drawn_toward", [(0, 180), (90, 270), (270, 90), (350, 170)])
+def test_live_wind_is_stored_as_the_direction_it_blows_toward(monkeypatch, blowing_from, drawn_toward):
+    monkeypatch.setattr(fetch_data, "get_real_time_weather_data", lambda **_: _weather(wind_direction_deg=blowing_from))
+    _, reading = live_refresh._reading(ROW)
+    assert reading["wind"] == 5.0
+    assert reading["wind_dir"] == drawn_toward
+
+
+def test_live_wind_without_a_direction_is_dropped(monkeypatch):
+    monkeypatch.setattr(fetch_data, "get_real_time_weather_data", lambda **_: _weather(wind_direction_deg="N/A"))
+    _, reading = live_refresh._reading(ROW)
+    assert "wind" not in reading and "wind_dir" not in reading
+    assert reading["temp"] == 30.0
@@ -0,0 +1,92 @@
+import json
+import sys
+
+import pytest
+from plotly.utils import PlotlyJSONEncoder
+
+import app  # registers the pages
+
+rainfall, temperature, wind = (sys.modules[f"pages.{name}"] for name in ("rainfall", "temperature", "wind"))
+
+# Whole page layout, base map figure included (about 20 KB today)
+MAX_LAYOUT_BYTES = 64 * 1024
+# Any server response to picking a state in the dropdown
+MAX_SELECT_RESPONSE_BYTES = 2 * 1024
+
+PAGES = [
+    # module, state dropdown, map graph, a state on the map
+    (rainfall, "state-select", "india-rainfall-map", "Kerala"),
+    (temperature, "temp-state-select", "india-temperature-map", "Kerala"),
+    (wind, "wind-state-select", "india-wind-map", "Kerala"),
+]
+
+
+@pytest.fixture(scope="module")
+def client():
+    return app.server.test_client()
+
+
+@pytest.fixture(scope="module")
+def dependencies(client):
+    return client.get("/_dash-dependencies").get_json()
+
+
+def _triggered_by(dependencies, component_id):
+    return [d for d in dependencies if any(i["id"] == component_id for i in d["inputs"])]
+
+
+def _outputs(output):
+    # "id.prop" or, for several outputs, "..id1.prop1...id2.prop2.."
+    return [dict(zip(("id", "property"), part.rsplit(".", 1))) for part in output.strip(".").split("...")]
+
+
+@pytest.mark.parametrize("page, dropdown, graph, state", PAGES)
+def test_layout_payload_stays_small(page, dropdown, graph, state):
+    size = len(json.dumps(page.layout(), cls=PlotlyJSONEncoder))
+    assert size < MAX_LAYOUT_BYTES, f"{page.__name__} layout is {size} bytes"
+
+
+@pytest.mark.parametrize("page, dropdown, graph, state", PAGES)
+def test_panning_sends_no_figure_from_the_server(dependencies, page, dropdown, graph, state):
+    figure_callbacks = [d for d in _triggered_by(dependencies, dropdown) if f"{graph}.figure" in d["output"]]
+    assert figure_callbacks, f"nothing pans {graph}"
+    assert all(d.get("clientside_function") for d in figure_callbacks)
+
+
+@pytest.mark.parametrize("page, dropdown, graph, state", PAGES)
+def test_state_selection_responses_stay_small(client, dependencies, page, dropdown, graph, state):
+    server_callbacks = [d for d in _triggered_by(dependencies, dropdown) if not d.get("clientside_function")]
+    assert server_callbacks
+    for d in server_callbacks:
+        outputs = _outputs(d["output"])
+        response = client.post("/_dash-update-component", json={
+            "output": d["output"],
+            "outputs": outputs if len(outputs) > 1 else outputs[0],
+            "inputs": [{"id": dropdown, "property": "value", "value": state}],
+            "changedPropIds": [f"{dropdown}.value"],
+            "state": [],
+        })
+        assert response.status_code in (200, 204)
+        size = len(response.get_data())
+        assert size < MAX_SELECT_RESPONSE_BYTES, f"{d['output']} sent {size} bytes"
+
+
+def test_wind_pan_and_zoom_stay_in_the_browser(dependencies):
+    # the view only reaches the server (via wind-map-view) for fields dense enough to thin
+    view = _triggered_by(dependencies, "india-wind-map")
+    assert view and all(d.get("clientside_function") for d in view)
+    assert all("wind-map-view.data" in d["output"] for d in view)
+
+
+def test_wind_view_response_is_a_partial_update(client, dependencies):
+    (thinning,) = _triggered_by(dependencies, "wind-map-view")
+    view = {"zoom": 7, "bounds": [76.0, 18.0, 80.0, 22.0]}
+    response = client.post("/_dash-update-component", json={
+        "output": thinning["output"],
+        "outputs": _outputs(thinning["output"])[0],
+        "inputs": [{"id": "wind-map-view", "property": "data", "value": view}],
+        "changedPropIds": ["wind-map-view.data"],
+        "state": [],
+    })
+    assert response.status_code in (200, 204)
+    assert len(response.get_data()) < MAX_SELECT_RESPONSE_BYTES
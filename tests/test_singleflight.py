@@ -0,0 +1,137 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from data import circuit_breaker, fetch_data, replay
+from data.singleflight import SingleFlight
+
+# Well above the 16 workers of the OpenWeather budget pool
+CALLERS = 40
+
+
+class _Upstream(BaseHTTPRequestHandler):
+    """Slow OpenWeather /weather and /forecast stand-in that counts its hits."""
+
+    hits = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with _Upstream.lock:
+            _Upstream.hits += 1
+        time.sleep(0.3)
+        if "/forecast" in self.path:
+            now = int(time.time()) // 10800 * 10800
+            body = {
+                "cod": "200",
+                "city": {"name": "Pune", "timezone": 19800},
+                "list": [
+                    {"dt": now + 10800 * (i + 1), "main": {"temp": 25.0, "humidity": 60},
+                     "wind": {"speed": 3.0}, "weather": [{"description": "clear sky"}]}
+                    for i in range(40)
+                ],
+            }
+        else:
+            body = {
+                "cod": 200, "name": "Pune", "coord": {"lat": 18.52, "lon": 73.86},
+                "main": {"temp": 27.5, "humidity": 55}, "weather": [{"description": "clear sky"}],
+                "wind": {"speed": 3.2, "deg": 270},
+            }
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Routes upstream.get to a local server (through the replay hook) and resets the caches."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Upstream)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(replay, "MODE", "replay")
+    monkeypatch.setattr(replay, "_base_url", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(fetch_data, "API_KEY", "test")
+    fetch_data._weather_cache.clear()
+    fetch_data._forecast_cache.clear()
+    _Upstream.hits = 0
+    yield _Upstream
+    server.shutdown()
+    server.server_close()
+
+
+def _concurrently(fn, n=CALLERS):
+    barrier = threading.Barrier(n)
+    results = [None] * n
+
+    def run(i):
+        barrier.wait()
+        results[i] = fn()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_weather_lookups_hit_upstream_once(upstream):
+    results = _concurrently(lambda: fetch_data.get_real_time_weather_data("Pune"))
+    assert upstream.hits == 1
+    assert all(r.get("city") == "Pune" for r in results), results[:3]
+
+
+def test_city_spelling_variants_share_one_lookup(upstream):
+    names = ["Pune", "pune", " PUNE ", "Pune  "]
+    results = _concurrently(lambda: fetch_data.get_real_time_weather_data(names[threading.get_ident() % 4]))
+    assert upstream.hits == 1
+    assert all("error" not in r for r in results)
+
+
+def test_concurrent_forecast_lookups_hit_upstream_once(upstream):
+    results = _concurrently(lambda: fetch_data.get_5_day_forecast_data("Pune"))
+    assert upstream.hits == 1
+    assert all(r.get("city") == "Pune" for r in results)
+
+
+def test_singleflight_shares_result_and_error():
+    flight = SingleFlight()
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        time.sleep(0.2)
+        if value == "boom":
+            raise ValueError(value)
+        return value
+
+    assert _concurrently(lambda: flight.do("k", slow, "ok"), n=10) == ["ok"] * 10
+
+    def failing():
+        try:
+            flight.do("e", slow, "boom")
+        except ValueError as e:
+            return str(e)
+
+    assert _concurrently(failing, n=10) == ["boom"] * 10
+    assert calls == ["ok", "boom"]
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_busy_pool_answers_every_caller_with_the_slow_error(upstream, monkeypatch):
+    def busy(fn, *args):
+        time.sleep(0.2)  # followers join the flight before the leader learns the pool is full
+        raise circuit_breaker.PoolBusy("openweather pool is busy")
+
+    monkeypatch.setattr(circuit_breaker.upstream_pool, "submit", busy)
+    results = _concurrently(lambda: fetch_data.get_real_time_weather_data("Pune"), n=10)
+    assert results == [{"error": fetch_data.SLOW_ERROR}] * 10
+    assert upstream.hits == 0